@@ -0,0 +1,6 @@
+"""
+File: __init__.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
@@ -0,0 +1,11 @@
+"""
+File: __main__.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import sys
+from .suite import main
+
+sys.exit(main())
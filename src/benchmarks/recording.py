@@ -0,0 +1,95 @@
+"""
+File: recording.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import tkinter as tk
+
+from graph_gui.graphgui import GraphGUI
+
+# Stand-ins for the turtle and the tkinter canvas that only record the calls
+# made to them, so GraphGUI.draw can be timed without a display
+
+
+class RecordingTurtle:
+    def __init__(self):
+        self.calls = []
+
+    def penup(self):
+        self.calls.append(("penup",))
+
+    def pendown(self):
+        self.calls.append(("pendown",))
+
+    def goto(self, x, y):
+        self.calls.append(("goto", x, y))
+
+    def color(self, *args):
+        self.calls.append(("color", args))
+
+    def pensize(self, width):
+        self.calls.append(("pensize", width))
+
+    def dot(self, size, *color):
+        self.calls.append(("dot", size, color))
+
+    def write(self, arg, **kwargs):
+        self.calls.append(("write", arg, kwargs))
+
+    def clear(self):
+        self.calls = []
+
+
+class _Master:
+    # GraphGUI places its widgets in canvas.master.master
+    def __init__(self):
+        self.master = None
+
+
+class RecordingCanvas:
+    def __init__(self):
+        self.master = _Master()
+        self.calls = []
+        self._item_count = 0
+
+    def _create(self, kind, args, kwargs):
+        self._item_count += 1
+        self.calls.append((kind, args, kwargs))
+        return self._item_count
+
+    def create_line(self, *args, **kwargs):
+        return self._create("line", args, kwargs)
+
+    def create_rectangle(self, *args, **kwargs):
+        return self._create("rectangle", args, kwargs)
+
+    def create_oval(self, *args, **kwargs):
+        return self._create("oval", args, kwargs)
+
+    def create_text(self, *args, **kwargs):
+        return self._create("text", args, kwargs)
+
+    def bbox(self, *items):
+        return (0, 0, 0, 0)
+
+    def tag_lower(self, *items):
+        self.calls.append(("tag_lower", items))
+
+    def move(self, item, x, y):
+        self.calls.append(("move", item, x, y))
+
+    def delete(self, *items):
+        if "all" in items:
+            self.calls = []
+
+
+class HeadlessGraphGUI(GraphGUI):
+    # GraphGUI without the buttons, which need a window
+    def __init__(self):
+        # The Tk variables of GraphGUI only need a Tcl interpreter
+        super().__init__(RecordingCanvas(), master=tk.Tcl())
+
+    def init_ui(self, canvas):
+        pass
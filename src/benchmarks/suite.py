@@ -0,0 +1,291 @@
+"""
+File: suite.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from math import sqrt
+from time import perf_counter
+
+from graph_gui.graph_data.graph import Graph
+from graph_gui.graph_data.node import Node
+from graph_gui.graph_data.edge import Edge
+from graph_gui.graph_data.generators import GENERATORS
+from graph_gui.nodegui import NodeGUI
+from graph_gui.edgegui import EdgeGUI
+from .recording import HeadlessGraphGUI, RecordingCanvas, RecordingTurtle
+
+# Times the path finding algorithms, saving and loading, and one draw frame
+# on seeded grid graphs of increasing size. Run from the src folder:
+#
+#   python -m benchmarks --output results.json
+#   python -m benchmarks --baseline baseline.json --threshold 0.2
+#
+# --generator uses the generators of graph_data instead of the grid below
+# A copy of a results file is the baseline for later runs. The exit code is 1
+# when a benchmark got slower than the baseline by more than the threshold
+
+RESULTS_VERSION = 2
+# Number of nodes of the benchmark graphs
+SIZES = (1000, 10000, 100000)
+ALGORITHMS = ("dijkstra", "astar", "bfs", "dfs")
+BENCHMARKS = ALGORITHMS + (
+    "save_csv",
+    "load_csv",
+    "save_binary",
+    "load_binary",
+    "draw",
+)
+# Allowed slowdown compared to the baseline, 0.2 is 20% slower
+THRESHOLD = 0.2
+# Benchmarks faster than this are too noisy to compare
+MIN_COMPARE_SECONDS = 0.001
+# A benchmark with a run slower than this is skipped for the larger graphs
+TIME_LIMIT = 10.0
+GRID_SPACING = 50
+
+
+def build_grid_graph(graph, node_count, seed, node_factory=Node, edge_factory=Edge):
+    # Grid of about node_count nodes with jittered positions, every node is
+    # connected to its right and lower neighbour
+    # The weights are at least the distance, so the euclidean heuristic holds
+    rng = random.Random(seed)
+    side = max(2, round(sqrt(node_count)))
+    nodes = []
+    for i in range(side * side):
+        x = GRID_SPACING * (i % side + 1) + rng.uniform(-10, 10)
+        y = GRID_SPACING * (i // side + 1) + rng.uniform(-10, 10)
+        nodes.append(node_factory(i, x, y))
+
+    edges = []
+    for i, node in enumerate(nodes):
+        neighbours = []
+        if i % side < side - 1:
+            neighbours.append(nodes[i + 1])
+        if i + side < len(nodes):
+            neighbours.append(nodes[i + side])
+        for adj_node in neighbours:
+            distance = graph.get_euclidean_distance(node, adj_node)
+            weight = round(distance * rng.uniform(1, 1.5) + 0.005, 2)
+            edges.append(edge_factory(len(edges), node, adj_node, weight))
+
+    with graph.batch():
+        graph.add_nodes(nodes)
+        graph.add_edges(edges)
+    return nodes[0], nodes[-1]
+
+
+def time_runs(function, args, setup=None):
+    # Seconds of every run, the remaining runs are left out once a run went
+    # over the time limit
+    times = []
+    for _ in range(args.repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start_time = perf_counter()
+        function()
+        times.append(perf_counter() - start_time)
+        if times[-1] > args.time_limit:
+            break
+    return times
+
+
+def run_size(node_count, args, names, folder):
+    # ({name: seconds of every run}, graph info) for one graph size
+    runs = {}
+    graph = Graph()
+    if args.generator:
+        graph.load_generated(args.generator, node_count, args.seed)
+        start_node, goal_node = graph.nodes[0], graph.nodes[-1]
+    else:
+        start_node, goal_node = build_grid_graph(graph, node_count, args.seed)
+    info = {"nodes": len(graph.nodes), "edges": len(graph.edges)}
+
+    for name in ALGORITHMS:
+        if name in names:
+            algorithm = getattr(graph, name)
+            runs[name] = time_runs(lambda: algorithm(start_node, goal_node), args)
+
+    nodelist_path = os.path.join(folder, "nodelist.csv")
+    edgelist_path = os.path.join(folder, "edgelist.csv")
+    binary_path = os.path.join(folder, "graph.bin")
+    # The load benchmarks need the saved files
+    if names & {"save_csv", "load_csv"}:
+        runs["save_csv"] = time_runs(
+            lambda: graph.save_to_files(nodelist_path, edgelist_path), args
+        )
+    if "load_csv" in names:
+        runs["load_csv"] = time_runs(
+            lambda: Graph().load_from_files(nodelist_path, edgelist_path),
+            args,
+        )
+    if names & {"save_binary", "load_binary", "draw"}:
+        runs["save_binary"] = time_runs(lambda: graph.save_binary(binary_path), args)
+    if "load_binary" in names:
+        runs["load_binary"] = time_runs(lambda: Graph().load_binary(binary_path), args)
+
+    if "draw" in names:
+        gui = HeadlessGraphGUI()
+        gui.load_binary(binary_path, NodeGUI, EdgeGUI)
+        tur = RecordingTurtle()
+        canvas = RecordingCanvas()
+
+        def clear_frame():
+            # Same as every frame of main.py
+            canvas.delete("all")
+            tur.clear()
+
+        def draw_frame():
+            gui.profiler.start_frame()
+            gui.draw(tur, canvas)
+            gui.profiler.end_frame()
+
+        runs["draw"] = time_runs(draw_frame, args, setup=clear_frame)
+        info["draw_calls"] = len(tur.calls) + len(canvas.calls)
+        # Mean seconds of the phases of GraphGUI.draw
+        info["draw_phases"] = gui.profiler.get_phase_means()
+
+    return {name: times for name, times in runs.items() if name in names}, info
+
+
+def run_suite(args, out):
+    names = set(args.only or BENCHMARKS)
+    results = {}
+    for node_count in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            # Graph methods print progress, keep it out of the report
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                runs, info = run_size(node_count, args, names, folder)
+
+        for name in BENCHMARKS:
+            if name not in runs:
+                continue
+            times = runs[name]
+            result = {"name": name, "seconds": min(times), "runs": times}
+            result.update(info)
+            results[f"{name}/{node_count}"] = result
+            print(
+                f"{name:<12} {info['nodes']:>9} nodes {min(times) * 1000:>12.3f} ms",
+                file=out,
+            )
+            if max(times) > args.time_limit:
+                # The larger graphs would take even longer
+                print(
+                    f"{name:<12} over {args.time_limit}s, skipping the larger graphs",
+                    file=out,
+                )
+                names.discard(name)
+    return results
+
+
+def compare_results(results, baseline, threshold, out):
+    # Prints every benchmark found in both, returns the names of regressions
+    regressions = []
+    for key, result in results.items():
+        base_result = baseline.get(key)
+        if base_result is None:
+            print(f"{key:<20} not in baseline", file=out)
+            continue
+        seconds = result["seconds"]
+        base_seconds = base_result["seconds"]
+        ratio = seconds / base_seconds if base_seconds > 0 else 1.0
+        status = ""
+        if max(seconds, base_seconds) < MIN_COMPARE_SECONDS:
+            status = "too fast to compare"
+        elif ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        print(
+            f"{key:<20} {base_seconds * 1000:>12.3f} ms -> "
+            f"{seconds * 1000:>12.3f} ms {ratio:>7.2f}x {status}",
+            file=out,
+        )
+    return regressions
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(SIZES),
+        help="number of nodes of the graphs",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the graphs")
+    parser.add_argument(
+        "--generator",
+        choices=sorted(GENERATORS),
+        help="graph_data generator used instead of the built in grid, needs numpy",
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=BENCHMARKS, help="benchmarks to run"
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=TIME_LIMIT,
+        help="skip the larger graphs of a benchmark slower than this many seconds",
+    )
+    parser.add_argument(
+        "--output", default="benchmark_results.json", help="results json file"
+    )
+    parser.add_argument("--baseline", help="results json file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="allowed slowdown compared to the baseline, 0.2 is 20%%",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    out = sys.stdout
+
+    results = run_suite(args, out)
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "version": RESULTS_VERSION,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "generator": args.generator,
+                "repeat": args.repeat,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Saved results to {args.output}", file=out)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("version") != RESULTS_VERSION:
+        print(f"Benchmark Error: {args.baseline} is not a results file", file=out)
+        return 2
+
+    regressions = compare_results(results, baseline["results"], args.threshold, out)
+    if regressions:
+        print(f"{len(regressions)} regressions: {', '.join(regressions)}", file=out)
+        return 1
+    print("No regressions", file=out)
+    return 0
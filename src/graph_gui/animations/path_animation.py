@@ -6,6 +6,8 @@ License: MIT
 """
 
 from ..constants import (
+    BACKWARD_SEEN_EDGE_COLOR,
+    BACKWARD_SEEN_NODE_COLOR,
     CURRENT_NODE_COLOR,
     SEEN_EDGE_COLOR,
     SEEN_NODE_COLOR,
@@ -58,10 +60,13 @@ class PathAnimation(AnimationInterface):
         # Draw the nodes in the visited nodes
         for i in range(self.edge_index + 1):
             node = self.graph.get_node_by_id(self.visited[i][0])
+            seen_color = SEEN_NODE_COLOR
+            if self.is_backward(i):
+                seen_color = BACKWARD_SEEN_NODE_COLOR
             ret.append(
                 {
                     "node": node,
-                    "color": SEEN_NODE_COLOR
+                    "color": seen_color
                     if i != self.edge_index
                     else CURRENT_NODE_COLOR,
                 }
@@ -76,10 +81,18 @@ class PathAnimation(AnimationInterface):
                 ret.append({"edge": self.path[i][1], "color": START_EDGE_COLOR})
 
         for i in range(self.edge_index + 1):
-            ret.append({"edge": self.visited[i][2], "color": SEEN_EDGE_COLOR})
+            seen_color = SEEN_EDGE_COLOR
+            if self.is_backward(i):
+                seen_color = BACKWARD_SEEN_EDGE_COLOR
+            ret.append({"edge": self.visited[i][2], "color": seen_color})
 
         return ret
 
+    def is_backward(self, index):
+        # Bidirectional searches tag each visited edge with its direction
+        visited = self.visited[index]
+        return len(visited) > 3 and visited[3] == "backward"
+
     def get_result_string(self):
         path = [self.start_node.id]
         for arr in self.path:
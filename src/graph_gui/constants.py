@@ -31,10 +31,16 @@ ANIMATION_DURATION = 0.6
 
 START_NODE_COLOR = "#0f0"
 SEEN_NODE_COLOR = "#f0f"
+BACKWARD_SEEN_NODE_COLOR = "#0ff"
 CURRENT_NODE_COLOR = "#ff0"
 END_NODE_COLOR = "#f00"
 
 START_EDGE_COLOR = "#0f0"
 SEEN_EDGE_COLOR = "#f0f"
+BACKWARD_SEEN_EDGE_COLOR = "#0ff"
 CURRENT_EDGE_COLOR = "#ff0"
 END_EDGE_COLOR = "#f00"
+
+# Profiler Style
+PROFILER_TEXT_COLOR = "#fff"
+PROFILER_BG_COLOR = "#000"
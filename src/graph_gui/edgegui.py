@@ -21,6 +21,8 @@ from .constants import (
 
 
 class EdgeGUI(Edge, Drawable, Clickable):
+    __slots__ = ("is_selected", "is_dragging")
+
     def __init__(self, *args):
         self.is_selected = False
         self.is_dragging = False
@@ -0,0 +1,167 @@
+"""
+File: frame_profiler.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from bisect import bisect_right
+from collections import deque
+from time import perf_counter
+
+from .constants import PROFILER_TEXT_COLOR, PROFILER_BG_COLOR
+
+# Phases of one frame in the order they happen, see main.one_step and
+# GraphGUI.draw
+PHASES = (
+    "clear",
+    "animation",
+    "edges",
+    "edge_labels",
+    "nodes",
+    "node_labels",
+    "help",
+    "overlay",
+    "tk_update",
+)
+# Number of frames kept for the overlay and its histogram
+HISTORY_FRAMES = 120
+# Upper bounds of the histogram buckets in ms, the last bucket has no bound
+HISTOGRAM_BUCKETS = (16, 33, 50, 100, 200)
+HISTOGRAM_BAR_WIDTH = 20
+# Top right corner of the overlay on the 1280 wide screen
+OVERLAY_X = 1270
+OVERLAY_Y = 50
+
+
+class FrameProfiler:
+    def __init__(self):
+        self.visible = False
+
+        # Rolling history of (frame start time, frame seconds, {phase: seconds})
+        self.frames = deque(maxlen=HISTORY_FRAMES)
+        self.frame_count = 0
+
+        # Open csv file while tracing
+        self.trace_file = None
+
+        self._frame_start_time = None
+        self._phase_start_time = perf_counter()
+        self._phases = {}
+
+    def start_frame(self):
+        self._frame_start_time = perf_counter()
+        self._phase_start_time = self._frame_start_time
+        self._phases = {}
+
+    def end_phase(self, name):
+        # Adds the time since the previous phase ended to the phase name
+        now = perf_counter()
+        self._phases[name] = self._phases.get(name, 0.0) + now - self._phase_start_time
+        self._phase_start_time = now
+
+    def end_frame(self):
+        if self._frame_start_time is None:
+            return
+        frame_time = perf_counter() - self._frame_start_time
+        self.frames.append((self._frame_start_time, frame_time, self._phases))
+        self.frame_count += 1
+
+        if self.trace_file is not None:
+            row = [self.frame_count, self._frame_start_time, frame_time]
+            row += [self._phases.get(name, 0.0) for name in PHASES]
+            self.trace_file.write(",".join(str(value) for value in row) + "\n")
+        self._frame_start_time = None
+
+    # ----------
+    # Statistics
+    # ----------
+
+    def get_fps(self):
+        # Frames per second over the history, including the time between
+        # the frames
+        if len(self.frames) < 2:
+            return 0.0
+        elapsed = self.frames[-1][0] - self.frames[0][0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self.frames) - 1) / elapsed
+
+    def get_phase_means(self):
+        # Mean seconds of every phase over the history
+        totals = {name: 0.0 for name in PHASES}
+        for _start_time, _frame_time, phases in self.frames:
+            for name, seconds in phases.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        count = max(len(self.frames), 1)
+        return {name: seconds / count for name, seconds in totals.items()}
+
+    def get_histogram(self):
+        # Number of frames of the history in every bucket
+        counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for _start_time, frame_time, _phases in self.frames:
+            counts[bisect_right(HISTOGRAM_BUCKETS, frame_time * 1000)] += 1
+        return counts
+
+    # ----------
+    # Trace
+    # ----------
+
+    def start_trace(self, path):
+        # Every following frame is written as one csv line to path
+        # Line buffered so the trace is complete even if the program crashes
+        self.stop_trace()
+        self.trace_file = open(path, "w", buffering=1)
+        header = ["frame", "start_time", "frame_time"] + list(PHASES)
+        self.trace_file.write(",".join(header) + "\n")
+
+    def stop_trace(self):
+        if self.trace_file is not None:
+            self.trace_file.close()
+            self.trace_file = None
+
+    # ----------
+    # Overlay
+    # ----------
+
+    def get_overlay_lines(self):
+        lines = [f"FPS {self.get_fps():6.1f}"]
+        if self.frames:
+            frame_times = sorted(frame[1] for frame in self.frames)
+            p50 = frame_times[len(frame_times) // 2] * 1000
+            p95 = frame_times[int(len(frame_times) * 0.95)] * 1000
+            lines.append(f"Frame p50 {p50:6.1f} ms  p95 {p95:6.1f} ms")
+        lines.append("")
+
+        for name, seconds in self.get_phase_means().items():
+            lines.append(f"{name:<12} {seconds * 1000:8.2f} ms")
+        if self.trace_file is not None:
+            lines.append(f"Tracing to {self.trace_file.name}")
+        lines.append("")
+
+        counts = self.get_histogram()
+        most = max(max(counts), 1)
+        labels = [f"<{bound}" for bound in HISTOGRAM_BUCKETS]
+        labels.append(f">={HISTOGRAM_BUCKETS[-1]}")
+        for label, count in zip(labels, counts):
+            bar = "#" * round(count / most * HISTOGRAM_BAR_WIDTH)
+            lines.append(f"{label:>5} ms {bar:<{HISTOGRAM_BAR_WIDTH}} {count:4}")
+        return lines
+
+    def draw(self, canvas):
+        if not self.visible:
+            return
+        text = canvas.create_text(
+            OVERLAY_X,
+            OVERLAY_Y,
+            text="\n".join(self.get_overlay_lines()),
+            font="Courier 10 normal",
+            fill=PROFILER_TEXT_COLOR,
+            anchor="ne",
+            justify="left",
+        )
+        x0, y0, x1, y1 = canvas.bbox(text)
+        background = canvas.create_rectangle(
+            x0 - 5, y0 - 5, x1 + 5, y1 + 5, fill=PROFILER_BG_COLOR, outline=""
+        )
+        canvas.tag_lower(background, text)
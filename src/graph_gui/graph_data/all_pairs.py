@@ -0,0 +1,162 @@
+"""
+File: all_pairs.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Graphs up to this many nodes use Floyd-Warshall when backend is "auto"
+FLOYD_WARSHALL_MAX_NODES = 3000
+# Min edge density (edges / nodes^2) for Floyd-Warshall when backend is "auto"
+FLOYD_WARSHALL_MIN_DENSITY = 0.05
+# Number of source nodes handled by a worker process per task
+SOURCES_PER_TASK = 64
+
+# Adjacency list set in every worker process by _init_worker
+_worker_adjacency = None
+
+
+def build_index(graph):
+    # Contiguous index for every node id
+    node_ids = [node.id for node in graph.nodes]
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    return node_ids, index
+
+
+def build_index_adjacency(graph, index):
+    # adjacency[i] = [(neighbour index, weight), ...]
+    # Built from graph._adjacency, so a pair of nodes joined by parallel
+    # edges uses the same edge as the path searches
+    adjacency = [None] * len(index)
+    for node_id, i in index.items():
+        adjacency[i] = [
+            (index[adj_id], edge.weight)
+            for adj_id, edge in graph._adjacency.get(node_id, {}).items()
+        ]
+    return adjacency
+
+
+def all_pairs_shortest_paths(graph, backend="auto", workers=None):
+    node_ids, index = build_index(graph)
+
+    if backend == "auto":
+        node_count = len(node_ids)
+        density = len(graph.edges) / max(node_count * node_count, 1)
+        if (
+            np is not None
+            and node_count <= FLOYD_WARSHALL_MAX_NODES
+            and density >= FLOYD_WARSHALL_MIN_DENSITY
+        ):
+            backend = "floyd_warshall"
+        else:
+            backend = "dijkstra"
+
+    if backend == "floyd_warshall":
+        if np is None:
+            raise Exception("The floyd_warshall backend requires numpy")
+        matrix = _floyd_warshall(build_index_adjacency(graph, index))
+    elif backend == "dijkstra":
+        matrix = _parallel_dijkstra(build_index_adjacency(graph, index), workers)
+    else:
+        raise Exception("Invalid all pairs shortest paths backend")
+
+    return {
+        # matrix[i][j] is the distance between node_ids[i] and node_ids[j]
+        # inf when there is no path
+        "matrix": matrix,
+        "node_ids": node_ids,
+        "index": index,
+    }
+
+
+def _floyd_warshall(adjacency):
+    node_count = len(adjacency)
+    dist = np.full((node_count, node_count), np.inf, dtype=np.float32)
+    for i, neighbours in enumerate(adjacency):
+        for j, weight in neighbours:
+            dist[i, j] = weight
+    np.fill_diagonal(dist, 0)
+
+    for k in range(node_count):
+        # Relax every pair through node k at once
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+
+    return dist
+
+
+def _parallel_dijkstra(adjacency, workers):
+    node_count = len(adjacency)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tasks = [
+        range(start, min(start + SOURCES_PER_TASK, node_count))
+        for start in range(0, node_count, SOURCES_PER_TASK)
+    ]
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(adjacency)
+        try:
+            rows = [row for task in tasks for row in _dijkstra_rows(task)]
+        finally:
+            # Don't keep the adjacency of this graph alive in this process
+            _init_worker(None)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(adjacency,)
+        ) as executor:
+            rows = [
+                row for chunk in executor.map(_dijkstra_rows, tasks) for row in chunk
+            ]
+
+    if np is None:
+        # List of array("f") rows
+        return rows
+    matrix = np.empty((node_count, node_count), dtype=np.float32)
+    for i, row in enumerate(rows):
+        matrix[i] = np.frombuffer(row, dtype=np.float32)
+    return matrix
+
+
+def _init_worker(adjacency):
+    global _worker_adjacency
+    _worker_adjacency = adjacency
+
+
+def _dijkstra_rows(sources):
+    return [_dijkstra_row(_worker_adjacency, source) for source in sources]
+
+
+def _dijkstra_row(adjacency, source):
+    # Distances from source to every index as a float32 row
+    row = array("f", [float("inf")]) * len(adjacency)
+    dist = {source: 0.0}
+    settled = set()
+
+    heap = [(0.0, source)]
+    while heap:
+        cur_dist, cur = heapq.heappop(heap)
+        if cur in settled:
+            continue
+        settled.add(cur)
+        row[cur] = cur_dist
+
+        for adj, weight in adjacency[cur]:
+            if adj in settled:
+                continue
+            new_dist = cur_dist + weight
+            if new_dist < dist.get(adj, float("inf")):
+                dist[adj] = new_dist
+                heapq.heappush(heap, (new_dist, adj))
+
+    return row
@@ -0,0 +1,135 @@
+"""
+File: batch_paths.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Pairs read from the input before they are grouped by source node
+PAIRS_PER_CHUNK = 100000
+# Groups waiting in the process pool per worker
+GROUPS_IN_FLIGHT_PER_WORKER = 4
+
+# Algorithms where one search from a source answers every goal
+TREE_ALGORITHMS = ("dijkstra", "bfs")
+
+# Plain Graph rebuilt in every worker process by _init_worker
+_worker_graph = None
+
+
+def find_shortest_paths(graph, pairs, algorithm, heuristic, workers):
+    # Generator of (start id, end id, path) with the path in the same format
+    # as Graph.find_shortest_path
+    if workers is None or workers <= 1:
+        for group in _iter_groups(pairs):
+            yield from _solve_group(graph, group, algorithm, heuristic)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(_get_graph_payload(graph),),
+    ) as executor:
+        max_in_flight = workers * GROUPS_IN_FLIGHT_PER_WORKER
+        in_flight = []
+        for group in _iter_groups(pairs):
+            in_flight.append(
+                executor.submit(_solve_group_in_worker, group, algorithm, heuristic)
+            )
+            if len(in_flight) >= max_in_flight:
+                yield from _resolve_results(graph, in_flight.pop(0).result())
+
+        for future in in_flight:
+            yield from _resolve_results(graph, future.result())
+
+
+def _iter_groups(pairs):
+    # Group consecutive chunks of pairs by start node so memory stays bounded
+    groups = OrderedDict()
+    count = 0
+    for start, end in pairs:
+        groups.setdefault(_get_id(start), []).append(_get_id(end))
+        count += 1
+        if count >= PAIRS_PER_CHUNK:
+            yield from groups.items()
+            groups = OrderedDict()
+            count = 0
+    yield from groups.items()
+
+
+def _get_id(node_or_id):
+    return getattr(node_or_id, "id", node_or_id)
+
+
+def _solve_group(graph, group, algorithm, heuristic):
+    start_id, end_ids = group
+
+    if algorithm in TREE_ALGORITHMS:
+        tree = graph.shortest_path_tree(start_id, end_ids, algorithm)
+        for end_id in end_ids:
+            path = tree.path_to(end_id) if tree else None
+            yield start_id, end_id, path
+        return
+
+    for end_id in end_ids:
+        path = graph.find_shortest_path(algorithm, start_id, end_id, heuristic)
+        yield start_id, end_id, path
+
+
+# ----------
+# Worker Process Methods
+# ----------
+
+
+def _get_graph_payload(graph):
+    # Plain tuples so GUI subclasses never have to be pickled
+    nodes = [(node.id, node.pos[0], node.pos[1]) for node in graph.nodes]
+    edges = [
+        (edge.id, edge.nodeA.id, edge.nodeB.id, edge.weight) for edge in graph.edges
+    ]
+    return nodes, edges
+
+
+def _init_worker(payload):
+    # Imported here to avoid a circular import with graph.py
+    from .graph import Graph
+    from .node import Node
+    from .edge import Edge
+
+    global _worker_graph
+    nodes, edges = payload
+    _worker_graph = Graph()
+    for node_id, x, y in nodes:
+        _worker_graph.add_node(Node(node_id, x, y))
+    for edge_id, nodeA_id, nodeB_id, weight in edges:
+        nodeA = _worker_graph.get_node_by_id(nodeA_id)
+        nodeB = _worker_graph.get_node_by_id(nodeB_id)
+        _worker_graph.add_edge(Edge(edge_id, nodeA, nodeB, weight))
+
+
+def _solve_group_in_worker(group, algorithm, heuristic):
+    # Edges are sent back as ids and resolved in the main process
+    results = []
+    for start_id, end_id, path in _solve_group(
+        _worker_graph, group, algorithm, heuristic
+    ):
+        if path:
+            path = [[node_id, edge.id if edge else None] for node_id, edge in path]
+        results.append((start_id, end_id, path))
+    return results
+
+
+def _resolve_results(graph, results):
+    for start_id, end_id, path in results:
+        if path:
+            path = [
+                [
+                    node_id,
+                    graph.get_edge_by_id(edge_id) if edge_id is not None else None,
+                ]
+                for node_id, edge_id in path
+            ]
+        yield start_id, end_id, path
@@ -0,0 +1,316 @@
+"""
+File: binary_io.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from .csv_io import atomic_write
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# File layout, all values little endian:
+#   header: magic, format version, flags, node count, edge count
+#   node columns: ids (int64), x (float64), y (float64)
+#   edge columns: ids (int64), nodeA ids (int64), nodeB ids (int64),
+#                 weights (float64)
+#   index columns, only when flags has FLAG_INDEX:
+#                 node rows sorted by id, edge rows sorted by id,
+#                 adjacency offsets per node row (node count + 1) and the
+#                 edge rows of every node row (2 * edge count), all int64
+# Every column is 8 byte aligned so it can be mapped without copying
+MAGIC = b"GVGRAPH\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+
+# Header flags
+FLAG_INDEX = 1
+
+# Rows converted to python objects at a time while loading
+CHUNK_ROWS = 1 << 16
+
+NODE_COLUMNS = (("node_ids", "q"), ("node_x", "d"), ("node_y", "d"))
+EDGE_COLUMNS = (
+    ("edge_ids", "q"),
+    ("edge_a", "q"),
+    ("edge_b", "q"),
+    ("edge_weights", "d"),
+)
+INDEX_COLUMNS = (
+    ("node_order", "q"),
+    ("edge_order", "q"),
+    ("adj_indptr", "q"),
+    ("adj_edges", "q"),
+)
+
+
+def get_column_layout(flags, node_count, edge_count):
+    # List of (name, typecode, length) in file order
+    layout = [(name, typecode, node_count) for name, typecode in NODE_COLUMNS]
+    layout += [(name, typecode, edge_count) for name, typecode in EDGE_COLUMNS]
+    if flags & FLAG_INDEX:
+        lengths = (node_count, edge_count, node_count + 1, 2 * edge_count)
+        layout += [
+            (name, typecode, length)
+            for (name, typecode), length in zip(INDEX_COLUMNS, lengths)
+        ]
+    return layout
+
+
+def is_binary_graph_file(path):
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def save_binary(path, nodes, edges):
+    save_binary_columns(
+        path,
+        {
+            "node_ids": array("q", (node.id for node in nodes)),
+            "node_x": array("d", (node.pos[0] for node in nodes)),
+            "node_y": array("d", (node.pos[1] for node in nodes)),
+            "edge_ids": array("q", (edge.id for edge in edges)),
+            "edge_a": array("q", (edge.nodeA.id for edge in edges)),
+            "edge_b": array("q", (edge.nodeB.id for edge in edges)),
+            "edge_weights": array("d", (edge.weight for edge in edges)),
+        },
+    )
+
+
+def save_binary_columns(path, columns):
+    # columns has the node and edge columns as arrays, numpy arrays or lists
+    columns = {
+        name: _to_array(columns[name], typecode)
+        for name, typecode in NODE_COLUMNS + EDGE_COLUMNS
+    }
+    columns.update(_build_index(columns))
+    node_count = len(columns["node_ids"])
+    edge_count = len(columns["edge_ids"])
+
+    # Written next to the file and then moved over it, so a graph that is
+    # still mapping the old file keeps reading valid data
+    with atomic_write(path) as file:
+        file.write(
+            HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_INDEX, node_count, edge_count)
+        )
+        for name, _typecode, _length in get_column_layout(
+            FLAG_INDEX, node_count, edge_count
+        ):
+            column = columns[name]
+            if sys.byteorder != "little":
+                column.byteswap()
+            column.tofile(file)
+
+
+def _to_array(values, typecode):
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if np is not None and isinstance(values, np.ndarray):
+        return array(typecode, np.ascontiguousarray(values, typecode).tobytes())
+    return array(typecode, values)
+
+
+def _build_index(columns):
+    if np is not None:
+        return _build_index_numpy(columns)
+
+    node_ids = columns["node_ids"]
+    edge_ids = columns["edge_ids"]
+    node_count = len(node_ids)
+    edge_count = len(edge_ids)
+
+    node_rows = {node_id: row for row, node_id in enumerate(node_ids)}
+    a_rows = [node_rows[node_id] for node_id in columns["edge_a"]]
+    b_rows = [node_rows[node_id] for node_id in columns["edge_b"]]
+
+    # Counting sort of the edge rows by endpoint row
+    counts = [0] * (node_count + 1)
+    for row in a_rows:
+        counts[row + 1] += 1
+    for row in b_rows:
+        counts[row + 1] += 1
+    for i in range(node_count):
+        counts[i + 1] += counts[i]
+
+    position = counts[:-1]
+    adj_edges = array("q", bytes(16 * edge_count))
+    for edge_row in range(edge_count):
+        for node_row in (a_rows[edge_row], b_rows[edge_row]):
+            adj_edges[position[node_row]] = edge_row
+            position[node_row] += 1
+
+    return {
+        "node_order": array("q", sorted(range(node_count), key=node_ids.__getitem__)),
+        "edge_order": array("q", sorted(range(edge_count), key=edge_ids.__getitem__)),
+        "adj_indptr": array("q", counts),
+        "adj_edges": adj_edges,
+    }
+
+
+def _build_index_numpy(columns):
+    # Same index as _build_index, in the same order
+    node_ids = np.frombuffer(columns["node_ids"], dtype=np.int64)
+    edge_ids = np.frombuffer(columns["edge_ids"], dtype=np.int64)
+    node_count = len(node_ids)
+    edge_count = len(edge_ids)
+
+    node_order = np.argsort(node_ids, kind="stable")
+    edge_order = np.argsort(edge_ids, kind="stable")
+    sorted_node_ids = node_ids[node_order]
+
+    # Endpoint rows interleaved as a, b per edge like the loop above
+    endpoint_rows = np.empty(2 * edge_count, dtype=np.int64)
+    for offset, name in enumerate(("edge_a", "edge_b")):
+        endpoint_ids = np.frombuffer(columns[name], dtype=np.int64)
+        if edge_count == 0:
+            continue
+        positions = np.searchsorted(sorted_node_ids, endpoint_ids)
+        positions = np.minimum(positions, max(node_count - 1, 0))
+        if node_count == 0 or np.any(sorted_node_ids[positions] != endpoint_ids):
+            print("Save Graph Error: An edge has a missing node")
+            raise Exception("Edge has a missing node")
+        endpoint_rows[offset::2] = node_order[positions]
+
+    adj_order = np.argsort(endpoint_rows, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(endpoint_rows, minlength=node_count), out=indptr[1:])
+
+    return {
+        "node_order": array("q", node_order.astype(np.int64).tobytes()),
+        "edge_order": array("q", edge_order.astype(np.int64).tobytes()),
+        "adj_indptr": array("q", indptr.tobytes()),
+        "adj_edges": array("q", (adj_order // 2).astype(np.int64).tobytes()),
+    }
+
+
+class BinaryGraphFile:
+    # Read only memory mapped view of a binary graph file
+    # Columns are memoryviews into the mapping, nothing is copied until a
+    # value is read
+    # Can be used with numpy through numpy.frombuffer(column)
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = None
+        self._views = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise Exception("Binary graph file is too small")
+
+        magic, version, flags, node_count, edge_count = HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC:
+            raise Exception("Not a binary graph file")
+        if version != FORMAT_VERSION:
+            raise Exception(f"Unsupported binary graph file version {version}")
+
+        self.node_count = node_count
+        self.edge_count = edge_count
+        # The index columns are needed by MappedStore
+        self.has_index = bool(flags & FLAG_INDEX)
+
+        layout = get_column_layout(flags, node_count, edge_count)
+        expected_size = HEADER.size + 8 * sum(length for _, _, length in layout)
+        if len(self._mmap) < expected_size:
+            raise Exception("Binary graph file is truncated")
+
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        offset = HEADER.size
+        for name, typecode, length in layout:
+            view = buffer[offset : offset + 8 * length]
+            if sys.byteorder == "little":
+                column = view.cast(typecode)
+                self._views.append(view)
+                self._views.append(column)
+            else:
+                # Big endian hosts have to copy and swap
+                column = array(typecode, view.tobytes())
+                column.byteswap()
+                view.release()
+            setattr(self, name, column)
+            offset += 8 * length
+
+    def find_node_row(self, node_id):
+        # Row of node_id or None, needs the index columns
+        if 0 <= node_id < self.node_count and self.node_ids[node_id] == node_id:
+            # Ids are usually the same as the rows
+            return node_id
+        return _find_row(self.node_ids, self.node_order, node_id)
+
+    def find_edge_row(self, edge_id):
+        # Row of edge_id or None, needs the index columns
+        if 0 <= edge_id < self.edge_count and self.edge_ids[edge_id] == edge_id:
+            return edge_id
+        return _find_row(self.edge_ids, self.edge_order, edge_id)
+
+    def iter_node_chunks(self):
+        # Same rows as csv_io.iter_node_chunks
+        for start in range(0, self.node_count, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, self.node_count)
+            yield zip(
+                self.node_ids[start:end].tolist(),
+                self.node_x[start:end].tolist(),
+                self.node_y[start:end].tolist(),
+            )
+
+    def iter_edge_chunks(self):
+        # Same rows as csv_io.iter_edge_chunks
+        for start in range(0, self.edge_count, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, self.edge_count)
+            yield zip(
+                self.edge_ids[start:end].tolist(),
+                self.edge_a[start:end].tolist(),
+                self.edge_b[start:end].tolist(),
+                self.edge_weights[start:end].tolist(),
+            )
+
+    def close(self):
+        # Views must be released before the mapping can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _find_row(ids, order, target):
+    # Binary search over the rows sorted by id
+    low = 0
+    high = len(order)
+    while low < high:
+        mid = (low + high) // 2
+        if ids[order[mid]] < target:
+            low = mid + 1
+        else:
+            high = mid
+    if low < len(order) and ids[order[low]] == target:
+        return order[low]
+    return None
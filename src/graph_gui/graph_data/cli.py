@@ -0,0 +1,319 @@
+"""
+File: cli.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from inspect import signature
+from itertools import chain
+from time import perf_counter
+
+from .graph import Graph
+from .binary_io import save_binary_columns
+from .csv_io import write_csv
+from . import generators
+
+# Command line tools that only need graph_data, so they run without a display
+# Never import tkinter, turtle or anything from graph_gui outside graph_data
+#
+#   python -m graph_gui.graph_data query --nodes nodelist.csv \
+#       --edges edgelist.csv --algorithm astar < pairs.txt
+#   python -m graph_gui.graph_data generate delaunay --count 1000000 \
+#       --binary graph.bin
+#
+# Every pair is answered with one json line on stdout, everything else is
+# written to stderr
+
+ALGORITHMS = ("dijkstra", "astar", "bidijkstra", "biastar", "ch", "bfs", "dfs")
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command == "query":
+        return run_query(args)
+    if args.command == "generate":
+        return run_generate(args)
+    parser.print_help(sys.stderr)
+    return 2
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="python -m graph_gui.graph_data")
+    commands = parser.add_subparsers(dest="command")
+
+    query = commands.add_parser(
+        "query", help="find shortest paths for start and goal pairs"
+    )
+    source = query.add_argument_group("graph")
+    source.add_argument("--nodes", help="nodelist csv file, needs --edges")
+    source.add_argument("--edges", help="edgelist csv file, needs --nodes")
+    source.add_argument("--journal", help="journal of the csv files to replay")
+    source.add_argument("--binary", help="binary graph file, opened lazily")
+    source.add_argument("--dimacs", help="DIMACS .gr file")
+    source.add_argument("--co", help="DIMACS .co coordinates for --dimacs")
+    source.add_argument("--metis", help="METIS graph file")
+    source.add_argument("--edge-list", help="edge list file")
+    source.add_argument(
+        "--load-workers",
+        type=int,
+        default=None,
+        help="processes used to parse csv files",
+    )
+
+    query.add_argument(
+        "--pairs",
+        default="-",
+        help="file with one 'start goal' pair per line, - for stdin (default)",
+    )
+    query.add_argument("--algorithm", choices=ALGORITHMS, default="dijkstra")
+    query.add_argument("--heuristic", default="euclidean", help="heuristic for A*")
+    query.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="clear the path cache before every query",
+    )
+    query.add_argument(
+        "--no-path",
+        action="store_true",
+        help="only print the cost and length of every path",
+    )
+    query.add_argument(
+        "--stats",
+        action="store_true",
+        help="add the counters and timings of every search",
+    )
+
+    generate = commands.add_parser(
+        "generate", help="write a seeded synthetic graph, needs numpy"
+    )
+    generate.add_argument("kind", choices=sorted(generators.GENERATORS))
+    generate.add_argument("--count", type=int, required=True, help="number of nodes")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument(
+        "--degree", type=float, help="average degree (geometric, regular)"
+    )
+    generate.add_argument(
+        "--attach", type=int, help="edges of every new node (barabasi_albert)"
+    )
+    generate.add_argument(
+        "--jitter", type=float, help="random move of the nodes (grid, delaunay)"
+    )
+    output = generate.add_argument_group("output")
+    output.add_argument("--binary", help="binary graph file")
+    output.add_argument("--nodes", help="nodelist csv file, needs --edges")
+    output.add_argument("--edges", help="edgelist csv file, needs --nodes")
+    return parser
+
+
+def load_graph(args):
+    graph = Graph()
+    if args.binary:
+        graph.load_mapped(args.binary)
+        if args.journal and args.nodes and args.edges:
+            graph.replay_journal(args.nodes, args.edges, args.journal)
+    elif args.nodes and args.edges:
+        if args.journal:
+            graph.load_incremental(
+                args.nodes, args.edges, args.journal, workers=args.load_workers
+            )
+        else:
+            graph.load_from_files(args.nodes, args.edges, workers=args.load_workers)
+    elif args.dimacs:
+        graph.load_dimacs(args.dimacs, args.co)
+    elif args.metis:
+        graph.load_metis(args.metis)
+    elif args.edge_list:
+        graph.load_edge_list(args.edge_list)
+    else:
+        return None
+    return graph
+
+
+def iter_pairs(file):
+    # (line number, start id, goal id) for every pair, "#" starts a comment
+    for line_number, line in enumerate(file, 1):
+        fields = line.split("#", 1)[0].replace(",", " ").split()
+        if not fields:
+            continue
+        try:
+            if len(fields) != 2:
+                raise ValueError()
+            yield line_number, int(fields[0]), int(fields[1])
+        except ValueError:
+            print(
+                f"Invalid pair on line {line_number}: {line.strip()}", file=sys.stderr
+            )
+
+
+def run_query(args):
+    out = sys.stdout
+    # Graph methods print progress, keep it out of the json lines
+    with redirect_stdout(sys.stderr):
+        start_time = perf_counter()
+        graph = load_graph(args)
+        if graph is None:
+            print("No graph given, use --nodes and --edges or another format")
+            return 2
+        print(f"Loaded graph in {perf_counter() - start_time:.3f}s")
+        if args.algorithm == "ch":
+            # Queries never build the hierarchy themselves
+            start_time = perf_counter()
+            graph.build_contraction_hierarchy()
+            print(f"Built contraction hierarchy in {perf_counter() - start_time:.3f}s")
+
+        if args.pairs == "-":
+            pairs_file = sys.stdin
+        else:
+            pairs_file = open(args.pairs)
+
+        # Cache hits only measure a dict lookup, they are reported apart
+        latencies = []
+        cached_latencies = []
+        found_count = 0
+        start_time = perf_counter()
+        try:
+            for _line_number, start_id, goal_id in iter_pairs(pairs_file):
+                if args.no_cache:
+                    graph.clear_path_cache()
+
+                cache_hits = graph.path_cache_hits
+                query_start = perf_counter()
+                result = run_one_query(graph, args, start_id, goal_id)
+                latency = perf_counter() - query_start
+                cached = graph.path_cache_hits > cache_hits
+                if cached:
+                    cached_latencies.append(latency)
+                else:
+                    latencies.append(latency)
+
+                result["ms"] = round(latency * 1000, 3)
+                result["cached"] = cached
+                if result.get("found"):
+                    found_count += 1
+                out.write(json.dumps(result) + "\n")
+        finally:
+            if pairs_file is not sys.stdin:
+                pairs_file.close()
+        out.flush()
+
+        print_summary(
+            latencies, cached_latencies, found_count, perf_counter() - start_time
+        )
+    return 0
+
+
+def run_one_query(graph, args, start_id, goal_id):
+    result = {"start": start_id, "goal": goal_id}
+    if graph.get_node_by_id(start_id) is None or graph.get_node_by_id(goal_id) is None:
+        result["found"] = False
+        result["error"] = "unknown node"
+        return result
+
+    found = graph.animate_shortest_path(
+        args.algorithm, start_id, goal_id, args.heuristic
+    )
+    path = found["final_path"] if found else None
+    result["found"] = bool(path)
+    result["visited"] = len(found["visited_nodes"]) if found else 0
+    if args.stats and found and found.get("stats"):
+        result["stats"] = found["stats"].to_dict()
+    if not path:
+        result["cost"] = None
+        return result
+
+    edges = [edge for _node_id, edge in path[1:]]
+    result["cost"] = sum(edge.weight for edge in edges)
+    result["length"] = len(edges)
+    if not args.no_path:
+        result["nodes"] = [node_id for node_id, _edge in path]
+        result["edges"] = [edge.id for edge in edges]
+    return result
+
+
+def get_generator_options(args):
+    options = {}
+    if args.degree is not None:
+        if args.kind == "regular":
+            options["degree"] = int(args.degree)
+        else:
+            options["degree"] = args.degree
+    if args.attach is not None:
+        options["edges"] = args.attach
+    if args.jitter is not None:
+        options["jitter"] = args.jitter
+    return options
+
+
+def format_row(row):
+    return ",".join(map(str, row))
+
+
+def run_generate(args):
+    with redirect_stdout(sys.stderr):
+        if not args.binary and not (args.nodes and args.edges):
+            print("No output given, use --binary or --nodes and --edges")
+            return 2
+
+        options = get_generator_options(args)
+        parameters = signature(generators.GENERATORS[args.kind]).parameters
+        for name in options:
+            if name not in parameters:
+                print(f"Invalid option for a {args.kind} graph: {name}")
+                return 2
+
+        start_time = perf_counter()
+        columns = generators.generate(args.kind, args.count, args.seed, **options)
+        edge_count = len(columns["edge_ids"])
+        print(
+            f"Generated {args.count} nodes and {edge_count} edges "
+            f"in {perf_counter() - start_time:.3f}s"
+        )
+
+        if args.binary:
+            print(f"Saving graph to {args.binary}")
+            save_binary_columns(args.binary, columns)
+        if args.nodes and args.edges:
+            print(f"Saving graph to {args.nodes} and {args.edges}")
+            for path, chunks in (
+                (args.nodes, generators.iter_node_chunks(columns)),
+                (args.edges, generators.iter_edge_chunks(columns)),
+            ):
+                write_csv(path, chain.from_iterable(chunks), format_row)
+        print(f"Done in {perf_counter() - start_time:.3f}s")
+    return 0
+
+
+def get_percentile(sorted_values, fraction):
+    # Nearest rank percentile
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def print_summary(latencies, cached_latencies, found_count, total_time):
+    count = len(latencies) + len(cached_latencies)
+    throughput = count / total_time if total_time > 0 else 0.0
+    print(f"Queries: {count}, found: {found_count}, time: {total_time:.3f}s")
+    print(f"Throughput: {throughput:.1f} queries/s")
+    print_latencies("Latency ms", latencies)
+    print_latencies("Cached latency ms", cached_latencies)
+
+
+def print_latencies(label, latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return
+    parts = [
+        f"p{round(fraction * 100)} {get_percentile(latencies, fraction) * 1000:.3f}"
+        for fraction in PERCENTILES
+    ]
+    parts.append(f"max {latencies[-1] * 1000:.3f}")
+    print(f"{label} ({len(latencies)} queries): " + ", ".join(parts))
@@ -0,0 +1,165 @@
+"""
+File: column_store.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from array import array
+
+
+class ColumnStore:
+    # Struct-of-arrays storage for node and edge data
+    # Node and edge rows are read and written through NodeView and EdgeView
+
+    def __init__(self):
+        # Node columns
+        self.node_ids = array("q")
+        self.node_x = array("d")
+        self.node_y = array("d")
+        # node id -> row, only built once an id differs from its row
+        self.node_rows = None
+
+        # Edge columns, endpoints are node rows
+        self.edge_ids = array("q")
+        self.edge_a = array("q")
+        self.edge_b = array("q")
+        self.edge_weights = array("d")
+
+    def add_node(self, node_id, x, y):
+        row = len(self.node_ids)
+        self.node_ids.append(node_id)
+        self.node_x.append(x)
+        self.node_y.append(y)
+        if self.node_rows is not None:
+            self.node_rows[node_id] = row
+        elif node_id != row:
+            self.node_rows = {other_id: i for i, other_id in enumerate(self.node_ids)}
+        return NodeView(self, row)
+
+    def get_node_row(self, node_id):
+        if self.node_rows is None:
+            # Ids are the same as the rows
+            return node_id
+        return self.node_rows[node_id]
+
+    def add_edge(self, edge_id, nodeA_id, nodeB_id, weight=1.0):
+        row = len(self.edge_ids)
+        self.edge_ids.append(edge_id)
+        self.edge_a.append(self.get_node_row(nodeA_id))
+        self.edge_b.append(self.get_node_row(nodeB_id))
+        self.edge_weights.append(weight)
+        return EdgeView(self, row)
+
+    def get_node(self, row):
+        return NodeView(self, row)
+
+    def get_edge(self, row):
+        return EdgeView(self, row)
+
+    def get_node_count(self):
+        return len(self.node_ids)
+
+    def get_edge_count(self):
+        return len(self.edge_ids)
+
+    def fill_graph(self, graph):
+        # Add a view for every row to graph
+        for row in range(len(self.node_ids)):
+            graph.add_node(NodeView(self, row))
+        for row in range(len(self.edge_ids)):
+            graph.add_edge(EdgeView(self, row))
+
+
+class PositionView:
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, i):
+        if i == 0 or i == -2:
+            return self.store.node_x[self.row]
+        if i == 1 or i == -1:
+            return self.store.node_y[self.row]
+        raise IndexError("position index out of range")
+
+    def __setitem__(self, i, value):
+        if i == 0 or i == -2:
+            self.store.node_x[self.row] = value
+        elif i == 1 or i == -1:
+            self.store.node_y[self.row] = value
+        else:
+            raise IndexError("position index out of range")
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        yield self.store.node_x[self.row]
+        yield self.store.node_y[self.row]
+
+
+class NodeView:
+    # Node whose id and position live in a ColumnStore
+    # Not a Node subclass, which would give every view the unused Node slots
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def id(self):
+        return self.store.node_ids[self.row]
+
+    @property
+    def pos(self):
+        return PositionView(self.store, self.row)
+
+    def __eq__(self, other):
+        if isinstance(other, NodeView):
+            return self.store is other.store and self.row == other.row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+
+class EdgeView:
+    # Edge whose id, endpoints and weight live in a ColumnStore
+    # Not an Edge subclass, which would give every view the unused Edge slots
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def id(self):
+        return self.store.edge_ids[self.row]
+
+    @property
+    def nodeA(self):
+        return NodeView(self.store, self.store.edge_a[self.row])
+
+    @property
+    def nodeB(self):
+        return NodeView(self.store, self.store.edge_b[self.row])
+
+    @property
+    def weight(self):
+        return self.store.edge_weights[self.row]
+
+    @weight.setter
+    def weight(self, value):
+        self.store.edge_weights[self.row] = value
+
+    def __eq__(self, other):
+        if isinstance(other, EdgeView):
+            return self.store is other.store and self.row == other.row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
@@ -0,0 +1,85 @@
+"""
+File: components.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+
+class ComponentIndex:
+    # Union-find over node ids
+    # Updated in place when nodes and edges are added, rebuilt lazily from
+    # the graph after anything is deleted
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.parent = {}
+        self.size = {}
+        self.is_dirty = True
+
+    def mark_dirty(self):
+        self.is_dirty = True
+        self.parent = {}
+        self.size = {}
+
+    def add_node(self, node_id):
+        if self.is_dirty:
+            return
+        if node_id not in self.parent:
+            self.parent[node_id] = node_id
+            self.size[node_id] = 1
+
+    def add_edge(self, nodeA_id, nodeB_id):
+        if self.is_dirty:
+            return
+        self.add_node(nodeA_id)
+        self.add_node(nodeB_id)
+        self._union(nodeA_id, nodeB_id)
+
+    def find(self, node_id):
+        if self.is_dirty:
+            self.rebuild()
+        if node_id not in self.parent:
+            return None
+
+        parent = self.parent
+        while parent[node_id] != node_id:
+            # Path halving
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    def is_connected(self, nodeA_id, nodeB_id):
+        rootA = self.find(nodeA_id)
+        return rootA is not None and rootA == self.find(nodeB_id)
+
+    def get_components(self):
+        # List of lists of node ids, one list per component
+        if self.is_dirty:
+            self.rebuild()
+        components = {}
+        for node_id in self.parent:
+            components.setdefault(self.find(node_id), []).append(node_id)
+        return list(components.values())
+
+    def rebuild(self):
+        self.is_dirty = False
+        self.parent = {}
+        self.size = {}
+        # The maps are up to date even while the graph is in a batch
+        for node_id in self.graph._node_map:
+            self.add_node(node_id)
+        for edge in self.graph._edge_map.values():
+            self.add_edge(edge.nodeA.id, edge.nodeB.id)
+
+    def _union(self, nodeA_id, nodeB_id):
+        rootA = self.find(nodeA_id)
+        rootB = self.find(nodeB_id)
+        if rootA == rootB:
+            return
+
+        # Attach the smaller tree below the larger one
+        if self.size[rootA] < self.size[rootB]:
+            rootA, rootB = rootB, rootA
+        self.parent[rootB] = rootA
+        self.size[rootA] += self.size[rootB]
@@ -0,0 +1,293 @@
+"""
+File: contraction_hierarchy.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import heapq
+
+# Limits for the local witness searches done while contracting a node
+# Lower limits build faster but may add a few unneeded shortcuts
+WITNESS_HOP_LIMIT = 5
+WITNESS_SETTLE_LIMIT = 500
+
+
+class ContractionHierarchy:
+    def __init__(self, graph):
+        self.graph = graph
+        self.rank = {}  # node id -> contraction order
+        # node id -> {higher ranked node id -> [weight, middle node id or None]}
+        self.upward = {}
+        self.shortcut_count = 0
+
+        self.build()
+
+    # ----------
+    # Preprocessing
+    # ----------
+
+    def build(self):
+        # Remaining graph as node id -> {node id -> [weight, middle node id or None]}
+        # Built from the adjacency so every node pair has the same single edge
+        # as in the other searches
+        remaining = {}
+        for node_id, neighbours in self.graph._adjacency.items():
+            remaining[node_id] = {
+                adj_id: [edge.weight, None]
+                for adj_id, edge in neighbours.items()
+                if adj_id != node_id
+            }
+
+        self.rank = {}
+        self.upward = {node_id: {} for node_id in remaining}
+        self.shortcut_count = 0
+        contracted_neighbours = {node_id: 0 for node_id in remaining}
+
+        # Order nodes by importance, a node is only queued again when one of
+        # its neighbours was contracted
+        priorities = {}
+        counter = 0
+        queue = []
+        for node_id in remaining:
+            priority = self._get_priority(remaining, contracted_neighbours, node_id)
+            priorities[node_id] = priority
+            queue.append((priority, counter, node_id))
+            counter += 1
+        heapq.heapify(queue)
+
+        while queue:
+            priority, _, node_id = heapq.heappop(queue)
+            if node_id not in remaining or priorities[node_id] != priority:
+                # Contracted, or queued again with a newer priority
+                continue
+
+            neighbour_ids = self._contract(remaining, contracted_neighbours, node_id)
+            for neighbour_id in neighbour_ids:
+                priority = self._get_priority(
+                    remaining, contracted_neighbours, neighbour_id
+                )
+                if priority != priorities[neighbour_id]:
+                    priorities[neighbour_id] = priority
+                    counter += 1
+                    heapq.heappush(queue, (priority, counter, neighbour_id))
+
+    def _get_priority(self, remaining, contracted_neighbours, node_id):
+        # Edge difference plus the number of already contracted neighbours
+        # The shortcuts are estimated with one hop witnesses, the direct edges
+        # between the neighbours, which is much cheaper than witness searches
+        neighbours = remaining[node_id]
+        neighbour_ids = list(neighbours)
+        shortcut_count = 0
+        for i, from_id in enumerate(neighbour_ids):
+            from_weight = neighbours[from_id][0]
+            from_edges = remaining[from_id]
+            for to_id in neighbour_ids[i + 1 :]:
+                direct = from_edges.get(to_id)
+                if direct is None or direct[0] > from_weight + neighbours[to_id][0]:
+                    shortcut_count += 1
+
+        degree = len(neighbour_ids)
+        return shortcut_count - degree + contracted_neighbours[node_id]
+
+    def _contract(self, remaining, contracted_neighbours, node_id):
+        # Returns the ids of the neighbours, whose priorities may have changed
+        self.rank[node_id] = len(self.rank)
+
+        for from_id, to_id, weight in self._find_shortcuts(remaining, node_id):
+            current = remaining[from_id].get(to_id)
+            if current is None or weight < current[0]:
+                remaining[from_id][to_id] = [weight, node_id]
+                remaining[to_id][from_id] = [weight, node_id]
+                self.shortcut_count += 1
+
+        # Every remaining neighbour is ranked higher than this node
+        neighbours = remaining.pop(node_id)
+        self.upward[node_id] = neighbours
+        for neighbour_id in neighbours:
+            del remaining[neighbour_id][node_id]
+            contracted_neighbours[neighbour_id] += 1
+        return list(neighbours)
+
+    def _find_shortcuts(self, remaining, node_id):
+        # Pairs of neighbours whose shortest path goes through node_id
+        neighbours = remaining[node_id]
+        neighbour_ids = list(neighbours)
+        shortcuts = []
+
+        for i, from_id in enumerate(neighbour_ids):
+            from_weight = neighbours[from_id][0]
+            from_edges = remaining[from_id]
+            targets = {}
+            for to_id in neighbour_ids[i + 1 :]:
+                via_dist = from_weight + neighbours[to_id][0]
+                direct = from_edges.get(to_id)
+                if direct is None or direct[0] > via_dist:
+                    # Only search for pairs without a direct witness edge
+                    targets[to_id] = via_dist
+            if not targets:
+                continue
+
+            witness = self._witness_search(
+                remaining, from_id, node_id, targets, max(targets.values())
+            )
+            for to_id, via_dist in targets.items():
+                if witness.get(to_id, float("inf")) > via_dist:
+                    shortcuts.append((from_id, to_id, via_dist))
+
+        return shortcuts
+
+    def _witness_search(self, remaining, source_id, ignored_id, targets, max_dist):
+        # Local Dijkstra from source_id that avoids ignored_id
+        # Paths of more than WITNESS_HOP_LIMIT edges are not followed
+        # The search ends at the largest distance still needed by a target
+        dist = {source_id: 0}
+        hops = {source_id: 0}
+        settled = set()
+        unfound = dict(targets)
+        heap = [(0, source_id)]
+
+        while heap and len(settled) < WITNESS_SETTLE_LIMIT:
+            cur_dist, cur_id = heapq.heappop(heap)
+            if cur_id in settled:
+                continue
+            if cur_dist > max_dist:
+                break
+            settled.add(cur_id)
+            if cur_id in unfound:
+                del unfound[cur_id]
+                if not unfound:
+                    break
+                max_dist = max(unfound.values())
+
+            next_hops = hops[cur_id] + 1
+            if next_hops > WITNESS_HOP_LIMIT:
+                continue
+            for adj_id, (weight, _middle) in remaining[cur_id].items():
+                if adj_id == ignored_id:
+                    continue
+                new_dist = cur_dist + weight
+                if new_dist > max_dist:
+                    continue
+                if new_dist < dist.get(adj_id, float("inf")):
+                    dist[adj_id] = new_dist
+                    hops[adj_id] = next_hops
+                    heapq.heappush(heap, (new_dist, adj_id))
+
+        return dist
+
+    # ----------
+    # Queries
+    # ----------
+
+    def query(self, start_node, end_node, stats=None):
+        # Bidirectional Dijkstra that only goes up the hierarchy
+        # The counters are added to stats when given
+        directions = ["forward", "backward"]
+        dists = [{start_node.id: 0}, {end_node.id: 0}]
+        paths = [{start_node.id: None}, {end_node.id: None}]
+        settled = [set(), set()]
+        heaps = [[(0, start_node.id)], [(0, end_node.id)]]
+
+        best_dist = float("inf")
+        meeting_node_id = None
+
+        visited_nodes = []
+        visited_edges = []
+        pushes = 2
+        pops = 0
+        relaxed = 0
+        peak_frontier = 2
+
+        while heaps[0] or heaps[1]:
+            # Pick the side with the smaller key
+            if not heaps[1] or (heaps[0] and heaps[0][0][0] <= heaps[1][0][0]):
+                side = 0
+            else:
+                side = 1
+
+            cur_dist, cur_id = heapq.heappop(heaps[side])
+            pops += 1
+            if cur_dist >= best_dist:
+                # Nothing left on this side can improve the path
+                heaps[side] = []
+                continue
+            if cur_id in settled[side]:
+                continue
+
+            settled[side].add(cur_id)
+            visited_nodes.append(cur_id)
+
+            other_dist = dists[1 - side].get(cur_id)
+            if other_dist is not None and cur_dist + other_dist < best_dist:
+                best_dist = cur_dist + other_dist
+                meeting_node_id = cur_id
+
+            for adj_id, (weight, middle) in self.upward.get(cur_id, {}).items():
+                if middle is None:
+                    edge = self.graph.get_edge_between_nodes(cur_id, adj_id)
+                    if edge:
+                        visited_edges.append([cur_id, adj_id, edge, directions[side]])
+
+                relaxed += 1
+                new_dist = cur_dist + weight
+                if new_dist < dists[side].get(adj_id, float("inf")):
+                    dists[side][adj_id] = new_dist
+                    paths[side][adj_id] = cur_id
+                    pushes += 1
+                    heapq.heappush(heaps[side], (new_dist, adj_id))
+            if len(heaps[0]) + len(heaps[1]) > peak_frontier:
+                peak_frontier = len(heaps[0]) + len(heaps[1])
+
+        if stats is not None:
+            stats.nodes_expanded += len(visited_nodes)
+            stats.edges_relaxed += relaxed
+            stats.heap_pushes += pushes
+            stats.heap_pops += pops
+            stats.peak_frontier = max(stats.peak_frontier, peak_frontier)
+
+        node_ids = []
+        if meeting_node_id is not None:
+            # Chain of hierarchy nodes from the start to the end node
+            cur_id = meeting_node_id
+            while cur_id is not None:
+                node_ids.append(cur_id)
+                cur_id = paths[0][cur_id]
+            node_ids.reverse()
+            cur_id = paths[1][meeting_node_id]
+            while cur_id is not None:
+                node_ids.append(cur_id)
+                cur_id = paths[1][cur_id]
+
+        return {
+            "node_ids": self.unpack(node_ids),
+            "visited_nodes": visited_nodes,
+            "visited_edges": visited_edges,
+        }
+
+    def unpack(self, node_ids):
+        # Replace every shortcut with the original nodes it skips
+        if not node_ids:
+            return []
+
+        unpacked = [node_ids[0]]
+        stack = []
+        for i in range(len(node_ids) - 1, 0, -1):
+            stack.append((node_ids[i - 1], node_ids[i]))
+
+        while stack:
+            from_id, to_id = stack.pop()
+            middle = self._get_middle(from_id, to_id)
+            if middle is None:
+                unpacked.append(to_id)
+            else:
+                stack.append((middle, to_id))
+                stack.append((from_id, middle))
+
+        return unpacked
+
+    def _get_middle(self, from_id, to_id):
+        # The lower ranked node stores the upward edge
+        if self.rank[from_id] < self.rank[to_id]:
+            return self.upward[from_id][to_id][1]
+        return self.upward[to_id][from_id][1]
@@ -0,0 +1,294 @@
+"""
+File: csr.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import heapq
+from array import array
+from collections import deque
+
+from .heuristics import resolve_heuristic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CSRNode:
+    # Stand-in for a Node of the snapshot, passed to the A* heuristics
+    __slots__ = ("index", "id", "pos")
+
+    def __init__(self, index, node_id, pos):
+        self.index = index
+        self.id = node_id
+        self.pos = pos
+
+
+class CSRGraph:
+    # Immutable compressed sparse row snapshot of a Graph
+    # The neighbours of node index i are indices[indptr[i]:indptr[i + 1]]
+    # with the matching weights and edge_ids at the same positions
+    # Every undirected edge is stored once in each direction
+    # Arrays are read only numpy arrays when numpy is installed, else
+    # array.array which must not be changed either
+
+    def __init__(self, graph):
+        node_count = len(graph.nodes)
+        self.node_ids = [node.id for node in graph.nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+        sources = array("q")
+        targets = array("q")
+        weights = array("d")
+        edge_ids = array("q")
+        for edge in graph.edges:
+            i = self.index[edge.nodeA.id]
+            j = self.index[edge.nodeB.id]
+            sources.extend((i, j))
+            targets.extend((j, i))
+            weights.extend((edge.weight, edge.weight))
+            edge_ids.extend((edge.id, edge.id))
+
+        xs = array("d", (node.pos[0] for node in graph.nodes))
+        ys = array("d", (node.pos[1] for node in graph.nodes))
+
+        if np is not None:
+            sources = np.frombuffer(sources, dtype=np.int64)
+            order = np.argsort(sources, kind="stable")
+            counts = np.bincount(sources, minlength=node_count)
+            self.indptr = np.zeros(node_count + 1, dtype=np.int64)
+            np.cumsum(counts, out=self.indptr[1:])
+            self.indices = np.frombuffer(targets, dtype=np.int64)[order]
+            self.weights = np.frombuffer(weights, dtype=np.float64)[order]
+            self.edge_ids = np.frombuffer(edge_ids, dtype=np.int64)[order]
+            self.coords = np.column_stack(
+                (
+                    np.frombuffer(xs, dtype=np.float64),
+                    np.frombuffer(ys, dtype=np.float64),
+                )
+            )
+            for column in (
+                self.indptr,
+                self.indices,
+                self.weights,
+                self.edge_ids,
+                self.coords,
+            ):
+                column.flags.writeable = False
+        else:
+            # Counting sort by source index
+            counts = [0] * (node_count + 1)
+            for i in sources:
+                counts[i + 1] += 1
+            for i in range(node_count):
+                counts[i + 1] += counts[i]
+            self.indptr = array("q", counts)
+
+            position = list(counts[:-1])
+            entry_count = len(sources)
+            self.indices = array("q", bytes(8 * entry_count))
+            self.weights = array("d", bytes(8 * entry_count))
+            self.edge_ids = array("q", bytes(8 * entry_count))
+            for k in range(entry_count):
+                i = sources[k]
+                p = position[i]
+                position[i] += 1
+                self.indices[p] = targets[k]
+                self.weights[p] = weights[k]
+                self.edge_ids[p] = edge_ids[k]
+            # (N, 2) as a list of [x, y] rows
+            self.coords = [[x, y] for x, y in zip(xs, ys)]
+
+        # Computed once, the snapshot never changes
+        self.min_weight_ratio = graph.get_min_weight_ratio()
+
+        # Plain lists used by the search kernels, created on first search
+        self._lists = None
+        # CSRNode of every node index, created on the first heuristic search
+        self._nodes = None
+
+    def get_node_count(self):
+        return len(self.node_ids)
+
+    def get_edge_count(self):
+        return len(self.indices) // 2
+
+    def _get_lists(self):
+        # Indexing python lists is much faster than indexing numpy arrays
+        # one element at a time
+        if self._lists is None:
+            # tolist() gives python numbers, list() would give numpy scalars
+            arrays = (self.indptr, self.indices, self.weights, self.edge_ids)
+            if np is not None:
+                lists = [column.tolist() for column in arrays]
+                coords = self.coords.tolist()
+            else:
+                lists = [list(column) for column in arrays]
+                coords = self.coords
+            self._lists = (*lists, coords)
+        return self._lists
+
+    # ----------
+    # Search Kernels
+    # ----------
+
+    def bfs(self, start_id, end_id):
+        indptr, indices, _weights, _edge_ids, _coords = self._get_lists()
+        start = self.index[start_id]
+        end = self.index[end_id]
+
+        prev = {start: -1}  # node index -> csr position of the edge used
+        parent = {start: -1}
+        visited = [start]
+        queue = deque([start])
+        while queue and end not in parent:
+            cur = queue.popleft()
+            for p in range(indptr[cur], indptr[cur + 1]):
+                adj = indices[p]
+                if adj in parent:
+                    continue
+                parent[adj] = cur
+                prev[adj] = p
+                visited.append(adj)
+                queue.append(adj)
+
+        return self._build_result(start, end, parent, prev, visited)
+
+    def dfs(self, start_id, end_id):
+        indptr, indices, _weights, _edge_ids, _coords = self._get_lists()
+        start = self.index[start_id]
+        end = self.index[end_id]
+
+        parent = {}
+        prev = {}
+        visited = []
+        seen = set()
+        # Stack of (node index, parent index, csr position of the edge used)
+        stack = [(start, -1, -1)]
+        while stack:
+            cur, cur_parent, p = stack.pop()
+            if cur in seen:
+                continue
+            seen.add(cur)
+            parent[cur] = cur_parent
+            prev[cur] = p
+            visited.append(cur)
+            if cur == end:
+                break
+
+            for q in range(indptr[cur + 1] - 1, indptr[cur] - 1, -1):
+                adj = indices[q]
+                if adj not in seen:
+                    stack.append((adj, cur, q))
+
+        return self._build_result(start, end, parent, prev, visited)
+
+    def dijkstra(self, start_id, end_id):
+        return self.astar(start_id, end_id, None)
+
+    def astar(self, start_id, end_id, heu_func="euclidean"):
+        indptr, indices, weights, _edge_ids, _coords = self._get_lists()
+        start = self.index[start_id]
+        end = self.index[end_id]
+        heuristic = self._get_heuristic(heu_func, end)
+
+        # Flat per-index arrays instead of dicts keep the inner loop cheap
+        inf = float("inf")
+        dist = [inf] * len(self.node_ids)
+        settled = bytearray(len(self.node_ids))
+        dist[start] = 0.0
+        parent = {start: -1}
+        prev = {start: -1}
+        visited = []
+
+        heap = [(0.0 if heuristic is None else heuristic(start), start)]
+        while heap:
+            _f_score, cur = heapq.heappop(heap)
+            if settled[cur]:
+                continue
+            settled[cur] = 1
+            visited.append(cur)
+            if cur == end:
+                break
+
+            cur_dist = dist[cur]
+            for p in range(indptr[cur], indptr[cur + 1]):
+                adj = indices[p]
+                if settled[adj]:
+                    continue
+                new_dist = cur_dist + weights[p]
+                if new_dist < dist[adj]:
+                    dist[adj] = new_dist
+                    parent[adj] = cur
+                    prev[adj] = p
+                    if heuristic is None:
+                        heapq.heappush(heap, (new_dist, adj))
+                    else:
+                        heapq.heappush(heap, (new_dist + heuristic(adj), adj))
+
+        return self._build_result(start, end, parent, prev, visited)
+
+    def _get_heuristic(self, heu_func, end):
+        # heu_func is a name of the heuristics registry or a
+        # callable(nodeA, nodeB) like Graph.astar takes, None for Dijkstra
+        # Returns h(node index) or None
+        if heu_func is None:
+            return None
+        nodes = self._get_nodes()
+        heuristic = resolve_heuristic(self, heu_func, nodes[end])
+        return lambda i: heuristic(nodes[i])
+
+    def _get_nodes(self):
+        if self._nodes is None:
+            coords = self._get_lists()[4]
+            self._nodes = [
+                CSRNode(i, node_id, coords[i])
+                for i, node_id in enumerate(self.node_ids)
+            ]
+        return self._nodes
+
+    # The heuristics registry measures through these, like on a Graph
+
+    def get_euclidean_distance(self, nodeA, nodeB):
+        x1, y1 = nodeA.pos
+        x2, y2 = nodeB.pos
+        return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+
+    def get_manhattan_distance(self, nodeA, nodeB):
+        x1, y1 = nodeA.pos
+        x2, y2 = nodeB.pos
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def get_min_weight_ratio(self):
+        # Same as Graph.get_min_weight_ratio, taken when the snapshot was made
+        return self.min_weight_ratio
+
+    def _build_result(self, start, end, parent, prev, visited):
+        _indptr, _indices, weights, edge_ids, _coords = self._get_lists()
+
+        node_ids = []
+        path_edge_ids = []
+        cost = None
+        if end in parent:
+            cost = 0.0
+            cur = end
+            while cur != start:
+                p = prev[cur]
+                node_ids.append(self.node_ids[cur])
+                path_edge_ids.append(edge_ids[p])
+                cost += weights[p]
+                cur = parent[cur]
+            node_ids.append(self.node_ids[start])
+            node_ids.reverse()
+            path_edge_ids.reverse()
+
+        return {
+            # node_ids[i + 1] is reached from node_ids[i] through edge_ids[i]
+            "node_ids": node_ids,
+            "edge_ids": path_edge_ids,
+            "cost": cost,
+            "visited_nodes": [self.node_ids[i] for i in visited],
+        }
@@ -0,0 +1,300 @@
+"""
+File: csv_io.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import gc
+import gzip
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice, repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bytes read from a csv file at a time, also the size of the byte ranges
+# parsed by the worker processes
+CHUNK_SIZE = 1 << 22
+# Byte ranges waiting in the process pool per worker
+RANGES_IN_FLIGHT_PER_WORKER = 2
+
+# Column types of the csv files
+NODE_COLUMN_TYPES = ("q", "d", "d")  # id, x, y
+EDGE_COLUMN_TYPES = ("q", "q", "q", "d")  # id, nodeA_id, nodeB_id, weight
+# Rows formatted into one string before it is written
+WRITE_CHUNK_ROWS = 1 << 16
+# Buffer of the output file
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+@contextmanager
+def pause_gc():
+    # Loading creates millions of objects that all stay alive, so the cyclic
+    # garbage collector would only rescan them over and over
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def iter_blocks(path, progress=None, stage=None):
+    # Yields blocks of whole lines read in large binary chunks
+    # progress(stage, bytes_done, bytes_total) is called after every chunk
+    # For compressed files the progress is in compressed bytes
+    total = os.path.getsize(path)
+    rest = b""
+    with open(path, "rb") as raw_file, open_input(raw_file, path) as file:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            done = raw_file.tell()
+            block = rest + chunk
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            yield block[:end]
+            if progress:
+                progress(stage, done, total)
+
+    if rest.strip():
+        yield rest
+
+
+def find_line_ranges(path, size):
+    # (start, end) byte ranges of about size bytes that end on line boundaries
+    total = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as file:
+        while start < total:
+            end = start + size
+            if end >= total:
+                end = total
+            else:
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def get_compression(path):
+    # Compression used for path, picked by the file extension
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        if zstandard is None:
+            print("Install the zstandard package to use .zst files")
+            raise Exception("zstandard is not installed")
+        return "zstd"
+    return None
+
+
+def open_input(raw_file, path):
+    # Readable binary file that decompresses raw_file if needed
+    compression = get_compression(path)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw_file, mode="rb")
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(raw_file)
+    return raw_file
+
+
+@contextmanager
+def atomic_write(path):
+    # Binary file that replaces path only once everything was written
+    # Nothing is left behind at path if writing fails
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb", buffering=WRITE_BUFFER_SIZE) as file:
+            yield file
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@contextmanager
+def open_output(path):
+    # Atomic binary file for path that compresses by the file extension
+    compression = get_compression(path)
+    with atomic_write(path) as raw_file:
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=6) as file:
+                yield file
+        elif compression == "zstd":
+            compressor = zstandard.ZstdCompressor()
+            with compressor.stream_writer(raw_file, closefd=False) as file:
+                yield file
+        else:
+            yield raw_file
+
+
+def iter_node_chunks(path, progress=None, workers=None):
+    # Yields chunks of (id, x, y) rows of a nodelist csv
+    return _iter_chunks(path, progress, workers, "nodes", parse_node_columns)
+
+
+def iter_edge_chunks(path, progress=None, workers=None):
+    # Yields chunks of (id, nodeA_id, nodeB_id, weight) rows of an edgelist csv
+    return _iter_chunks(path, progress, workers, "edges", parse_edge_columns)
+
+
+def _iter_chunks(path, progress, workers, stage, parse):
+    if workers is None or workers <= 1 or get_compression(path):
+        # Compressed files can not be split into byte ranges
+        for block in iter_blocks(path, progress, stage):
+            yield columns_to_rows(parse(block))
+        return
+
+    total = os.path.getsize(path)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for start, end in find_line_ranges(path, CHUNK_SIZE):
+            future = executor.submit(_parse_range, path, start, end, parse)
+            in_flight.append((end, future))
+            if len(in_flight) >= workers * RANGES_IN_FLIGHT_PER_WORKER:
+                end, future = in_flight.popleft()
+                yield columns_to_rows(future.result())
+                if progress:
+                    progress(stage, end, total)
+
+        for end, future in in_flight:
+            yield columns_to_rows(future.result())
+            if progress:
+                progress(stage, end, total)
+
+
+def _parse_range(path, start, end, parse):
+    # Runs in a worker process
+    with open(path, "rb") as file:
+        file.seek(start)
+        return parse(file.read(end - start))
+
+
+def columns_to_rows(columns):
+    return zip(*(column.tolist() for column in columns))
+
+
+def parse_node_columns(data):
+    # (ids, xs, ys) of the nodelist rows in data
+    return _parse_columns(data, NODE_COLUMN_TYPES)
+
+
+def parse_edge_columns(data):
+    # (ids, nodeA ids, nodeB ids, weights) of the edgelist rows in data
+    # The weight defaults to 1.0
+    return _parse_columns(data, EDGE_COLUMN_TYPES, 1.0)
+
+
+def _parse_columns(data, typecodes, default=None):
+    # Columns are numpy arrays when numpy is installed, else array.array
+    column_count = len(typecodes)
+    data = data.replace(b"\r", b"").strip()
+    lines = data.split(b"\n") if data else []
+    row_count = len(lines)
+
+    # When every line has the same number of fields, split the whole block
+    # at once and slice out the columns, much faster than splitting it line
+    # by line
+    comma_counts = set(map(bytes.count, lines, repeat(b",")))
+    if comma_counts == {column_count - 1}:
+        fields = b",".join(lines).split(b",")
+        columns = [fields[i::column_count] for i in range(column_count)]
+    elif default is not None and comma_counts == {column_count - 2}:
+        fields = b",".join(lines).split(b",")
+        columns = [fields[i :: column_count - 1] for i in range(column_count - 1)]
+        columns.append([default] * row_count)
+    else:
+        columns = _parse_rows(data, column_count, default)
+
+    ret = []
+    for values, typecode in zip(columns, typecodes):
+        if np is not None:
+            dtype = np.int64 if typecode == "q" else np.float64
+            ret.append(np.array(values, dtype=dtype))
+        else:
+            ret.append(array(typecode, map(int if typecode == "q" else float, values)))
+    return tuple(ret)
+
+
+def _parse_rows(data, column_count, default):
+    # Slow path for blocks with blank lines or rows of different lengths
+    # Rows missing a required column are skipped
+    required = column_count if default is None else column_count - 1
+    columns = [[] for _ in range(column_count)]
+    for line in data.split(b"\n"):
+        row = line.split(b",")
+        if len(row) < required:
+            continue
+        for i in range(column_count):
+            if i < len(row) and row[i].strip():
+                columns[i].append(row[i])
+            else:
+                columns[i].append(default)
+    return columns
+
+
+def iter_node_rows(path, progress=None):
+    for rows in iter_node_chunks(path, progress):
+        yield from rows
+
+
+def iter_edge_rows(path, progress=None):
+    for rows in iter_edge_chunks(path, progress):
+        yield from rows
+
+
+def iter_text_chunks(rows, format_row):
+    # Yields the csv text of rows in chunks of WRITE_CHUNK_ROWS rows
+    # Rows are separated by newlines with no newline at the end
+    rows = iter(rows)
+    separator = ""
+    while True:
+        chunk = list(islice(rows, WRITE_CHUNK_ROWS))
+        if not chunk:
+            break
+        yield separator + "\n".join(map(format_row, chunk))
+        separator = "\n"
+
+
+def format_node(node):
+    # id,x,y
+    x, y = node.pos
+    return f"{node.id},{format_position(x)},{format_position(y)}"
+
+
+def format_position(value):
+    # Positions are stored as floats, integer ones are written as ints like
+    # before, "100" instead of "100.0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def format_edge(edge):
+    # id,nodeA_id,nodeB_id,weight
+    return f"{edge.id},{edge.nodeA.id},{edge.nodeB.id},{edge.weight}"
+
+
+def write_csv(path, rows, format_row):
+    # Write rows to path, compressed if path ends with .gz or .zst
+    with open_output(path) as file:
+        for text in iter_text_chunks(rows, format_row):
+            file.write(text.encode())
@@ -7,6 +7,8 @@ License: MIT
 
 
 class Edge:
+    __slots__ = ("id", "nodeA", "nodeB", "weight")
+
     _id = 0
 
     def __init__(self, *args):
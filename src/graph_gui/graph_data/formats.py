@@ -0,0 +1,310 @@
+"""
+File: formats.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from .csv_io import iter_blocks, iter_text_chunks, open_output
+
+# Importers yield chunks of rows for Graph._load_chunks and read the files
+# in large blocks, so memory is bounded by the graph that is built
+# Files ending with .gz or .zst are decompressed on the fly
+#
+# DIMACS shortest path format (.gr arcs and .co coordinates)
+#   p sp <nodes> <arcs>        a <from> <to> <weight>        c <comment>
+#   p aux sp co <nodes>        v <id> <x> <y>
+# METIS graph format, node i is the i-th line after the header
+#   <nodes> <edges> [fmt [ncon]]
+#   [size] [weights...] <neighbour> [weight] <neighbour> [weight] ...
+# Edge list (SNAP), lines starting with # or % are comments
+#   <from> <to> [weight]
+
+# Rows yielded per chunk
+ROWS_PER_CHUNK = 1 << 16
+# Distance between nodes placed on a grid when a format has no positions
+GRID_SPACING = 50
+
+
+def get_grid_position(index, node_count):
+    side = max(1, int(node_count**0.5 + 0.5))
+    return (
+        GRID_SPACING * (index % side + 1),
+        GRID_SPACING * (index // side + 1),
+    )
+
+
+def iter_lines(path):
+    for block in iter_blocks(path):
+        lines = block.split(b"\n")
+        if block.endswith(b"\n"):
+            lines.pop()
+        yield from lines
+
+
+def _iter_columns(path, is_record, column_count, optional_last=False):
+    # Yields the first column_count columns of the record lines of every
+    # block, a missing optional last value is None
+    for block in iter_blocks(path):
+        lines = [line for line in block.split(b"\n") if is_record(line)]
+        # Split the whole block at once when every line has the same fields
+        field_counts = set(map(len, map(bytes.split, lines)))
+        if field_counts == {column_count}:
+            fields = b" ".join(lines).split()
+            yield [fields[i::column_count] for i in range(column_count)]
+            continue
+        if optional_last and field_counts == {column_count - 1}:
+            fields = b" ".join(lines).split()
+            columns = [fields[i :: column_count - 1] for i in range(column_count - 1)]
+            yield columns + [[None] * len(lines)]
+            continue
+
+        columns = [[] for _ in range(column_count)]
+        for line in lines:
+            line_fields = line.split()
+            for i in range(column_count):
+                columns[i].append(line_fields[i] if i < len(line_fields) else None)
+        yield columns
+
+
+def _iter_chunks(rows):
+    # Group rows into lists of ROWS_PER_CHUNK
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_lines(path, lines):
+    with open_output(path) as file:
+        for text in iter_text_chunks(lines, str):
+            file.write(text.encode())
+        file.write(b"\n")
+
+
+def format_weight(weight):
+    # Integer formats get integers whenever the weight allows it
+    weight = float(weight)
+    if weight.is_integer():
+        return str(int(weight))
+    return repr(weight)
+
+
+def _get_node_numbers(nodes):
+    # DIMACS and METIS number the nodes from 1
+    return {node.id: number for number, node in enumerate(nodes, 1)}
+
+
+# ----------
+# DIMACS
+# ----------
+
+
+def iter_dimacs_node_chunks(gr_path, co_path=None):
+    # Nodes of the .co file, or nodes 1..n on a grid without one
+    if co_path is not None:
+        return _iter_dimacs_coordinates(co_path)
+
+    node_count = None
+    for line in iter_lines(gr_path):
+        fields = line.split()
+        if fields and fields[0] == b"p":
+            node_count = int(fields[2])
+            break
+    if node_count is None:
+        print(f"Import Graph Error: No problem line in {gr_path}")
+        raise Exception("DIMACS file has no problem line")
+    return _iter_chunks(
+        (i + 1, *get_grid_position(i, node_count)) for i in range(node_count)
+    )
+
+
+def _is_dimacs_node(line):
+    return line[:1] == b"v"
+
+
+def _is_dimacs_arc(line):
+    return line[:1] == b"a"
+
+
+def _iter_dimacs_coordinates(co_path):
+    for _tags, ids, xs, ys in _iter_columns(co_path, _is_dimacs_node, 4):
+        yield zip(map(int, ids), map(float, xs), map(float, ys))
+
+
+def iter_dimacs_edge_chunks(gr_path):
+    # Arcs are directed, the two arcs of an edge and any parallel arcs are
+    # merged into one edge with the smallest weight by loading with
+    # merge_parallel
+    edge_id = 0
+    for _tags, a_ids, b_ids, weights in _iter_columns(gr_path, _is_dimacs_arc, 4):
+        yield zip(
+            range(edge_id, edge_id + len(a_ids)),
+            map(int, a_ids),
+            map(int, b_ids),
+            map(float, weights),
+        )
+        edge_id += len(a_ids)
+
+
+def write_dimacs(gr_path, co_path, nodes, edges):
+    # Every edge is written as two arcs
+    numbers = _get_node_numbers(nodes)
+
+    def iter_arcs():
+        yield "c Written by graph-visualizer-python"
+        yield f"p sp {len(numbers)} {2 * len(edges)}"
+        for edge in edges:
+            a = numbers[edge.nodeA.id]
+            b = numbers[edge.nodeB.id]
+            weight = format_weight(edge.weight)
+            yield f"a {a} {b} {weight}"
+            yield f"a {b} {a} {weight}"
+
+    _write_lines(gr_path, iter_arcs())
+    if co_path is None:
+        return
+
+    def iter_coordinates():
+        yield "c Written by graph-visualizer-python"
+        yield f"p aux sp co {len(numbers)}"
+        for node in nodes:
+            x = format_weight(node.pos[0])
+            y = format_weight(node.pos[1])
+            yield f"v {numbers[node.id]} {x} {y}"
+
+    _write_lines(co_path, iter_coordinates())
+
+
+# ----------
+# METIS
+# ----------
+
+
+def _iter_metis_lines(path):
+    # Header fields and then the neighbour line of every node
+    lines = (line for line in iter_lines(path) if line[:1] != b"%")
+    header = next(lines, b"").split()
+    if len(header) < 2:
+        print(f"Import Graph Error: No header in {path}")
+        raise Exception("METIS file has no header")
+    return header, lines
+
+
+def iter_metis_node_chunks(path):
+    header, _lines = _iter_metis_lines(path)
+    node_count = int(header[0])
+    return _iter_chunks(
+        (i + 1, *get_grid_position(i, node_count)) for i in range(node_count)
+    )
+
+
+def iter_metis_edge_chunks(path):
+    header, lines = _iter_metis_lines(path)
+    node_count = int(header[0])
+    fmt = header[2].decode().zfill(3) if len(header) >= 3 else "000"
+    constraint_count = int(header[3]) if len(header) >= 4 else 1
+    has_sizes = fmt[0] == "1"
+    has_node_weights = fmt[1] == "1"
+    has_edge_weights = fmt[2] == "1"
+
+    # Fields before the neighbours
+    skip = int(has_sizes) + (constraint_count if has_node_weights else 0)
+    step = 2 if has_edge_weights else 1
+
+    def iter_rows():
+        edge_id = 0
+        for node_id, line in zip(range(1, node_count + 1), lines):
+            fields = line.split()[skip:]
+            for i in range(0, len(fields) - step + 1, step):
+                adj_id = int(fields[i])
+                # Every edge is listed by both of its nodes
+                if adj_id <= node_id:
+                    continue
+                weight = float(fields[i + 1]) if has_edge_weights else 1.0
+                yield edge_id, node_id, adj_id, weight
+                edge_id += 1
+
+    return _iter_chunks(iter_rows())
+
+
+def write_metis(path, nodes, adjacency):
+    # METIS needs integer edge weights and no self loops
+    numbers = _get_node_numbers(nodes)
+    edge_count = 0
+    for node in nodes:
+        neighbours = adjacency.get(node.id, {})
+        edge_count += len(neighbours) - (node.id in neighbours)
+    edge_count //= 2
+
+    def iter_lines_out():
+        yield f"{len(numbers)} {edge_count} 001"
+        for node in nodes:
+            fields = []
+            for adj_id, edge in adjacency.get(node.id, {}).items():
+                if adj_id == node.id:
+                    continue
+                weight = float(edge.weight)
+                if not weight.is_integer() or weight < 1:
+                    print("Export Graph Error: METIS needs positive integer weights")
+                    raise Exception("METIS needs positive integer weights")
+                fields.append(f"{numbers[adj_id]} {int(weight)}")
+            yield " ".join(fields)
+
+    _write_lines(path, iter_lines_out())
+
+
+# ----------
+# Edge List
+# ----------
+
+
+def _is_edge_list_edge(line):
+    return line[:1] not in (b"#", b"%") and len(line.split(None, 2)) >= 2
+
+
+def _iter_edge_list_columns(path):
+    # (from ids, to ids, weights), weights missing from the file are None
+    return _iter_columns(path, _is_edge_list_edge, 3, optional_last=True)
+
+
+def iter_edge_list_node_chunks(path):
+    # Nodes in the order they first appear, placed on a grid
+    # Reads the file once to find them
+    node_ids = {}
+    for a_ids, b_ids, _weights in _iter_edge_list_columns(path):
+        for a_id, b_id in zip(map(int, a_ids), map(int, b_ids)):
+            node_ids[a_id] = None
+            node_ids[b_id] = None
+    node_count = len(node_ids)
+    return _iter_chunks(
+        (node_id, *get_grid_position(i, node_count))
+        for i, node_id in enumerate(node_ids)
+    )
+
+
+def iter_edge_list_edge_chunks(path):
+    edge_id = 0
+    for a_ids, b_ids, weights in _iter_edge_list_columns(path):
+        yield zip(
+            range(edge_id, edge_id + len(a_ids)),
+            map(int, a_ids),
+            map(int, b_ids),
+            (1.0 if weight is None else float(weight) for weight in weights),
+        )
+        edge_id += len(a_ids)
+
+
+def write_edge_list(path, nodes, edges):
+    def iter_lines_out():
+        yield f"# Nodes: {len(nodes)} Edges: {len(edges)}"
+        yield "# FromNodeId\tToNodeId\tWeight"
+        for edge in edges:
+            weight = format_weight(edge.weight)
+            yield f"{edge.nodeA.id}\t{edge.nodeB.id}\t{weight}"
+
+    _write_lines(path, iter_lines_out())
@@ -0,0 +1,252 @@
+"""
+File: generators.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from .formats import GRID_SPACING, ROWS_PER_CHUNK
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Seeded generators of large graphs with positions, for scale testing
+# Every generator returns the columns of the binary graph format:
+#   node_ids, node_x, node_y, edge_ids, edge_a, edge_b, edge_weights
+# as numpy arrays. Node ids are 0..node_count-1 and the weights are the
+# euclidean distances rounded up to 2 decimals, so the A* heuristics hold
+# The columns can be loaded with Graph.load_generated or written with
+# binary_io.save_binary_columns without creating any Node or Edge
+
+
+def _require_numpy():
+    if np is None:
+        print("Generate Graph Error: numpy is not installed")
+        raise Exception("Generating graphs requires numpy")
+
+
+def _make_columns(x, y, a_ids, b_ids):
+    weights = np.hypot(x[a_ids] - x[b_ids], y[a_ids] - y[b_ids])
+    return {
+        "node_ids": np.arange(len(x), dtype=np.int64),
+        "node_x": x.astype(np.float64),
+        "node_y": y.astype(np.float64),
+        "edge_ids": np.arange(len(a_ids), dtype=np.int64),
+        "edge_a": a_ids.astype(np.int64),
+        "edge_b": b_ids.astype(np.int64),
+        "edge_weights": np.ceil(weights * 100) / 100,
+    }
+
+
+def _random_positions(rng, node_count, spacing):
+    # Uniform in a square with the density of a grid of spacing
+    side = spacing * max(node_count, 1) ** 0.5
+    x = spacing + rng.random(node_count) * side
+    y = spacing + rng.random(node_count) * side
+    return x, y
+
+
+def _grid_positions(rng, node_count, columns, spacing, jitter):
+    # Same placement as formats.get_grid_position, moved by up to
+    # jitter * spacing in both directions
+    index = np.arange(node_count)
+    x = spacing * (index % columns + 1.0)
+    y = spacing * (index // columns + 1.0)
+    if jitter:
+        x += rng.uniform(-jitter, jitter, node_count) * spacing
+        y += rng.uniform(-jitter, jitter, node_count) * spacing
+    return x, y
+
+
+def _drop_repeated_edges(a_ids, b_ids):
+    # Removes self loops and every repeat of an edge, keeping the edge order
+    low = np.minimum(a_ids, b_ids)
+    high = np.maximum(a_ids, b_ids)
+    keep = low != high
+    low, high = low[keep], high[keep]
+    _keys, first = np.unique(low * (high.max(initial=0) + 1) + high, return_index=True)
+    first.sort()
+    return low[first], high[first]
+
+
+def generate_grid(node_count, seed=0, spacing=GRID_SPACING, jitter=0.0):
+    # Square lattice, every node is connected to its right and lower neighbour
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    columns = max(1, round(node_count**0.5))
+    x, y = _grid_positions(rng, node_count, columns, spacing, jitter)
+
+    index = np.arange(node_count)
+    right = index[(index % columns < columns - 1) & (index + 1 < node_count)]
+    down = index[index + columns < node_count]
+    a_ids = np.concatenate((right, down))
+    b_ids = np.concatenate((right + 1, down + columns))
+    return _make_columns(x, y, a_ids, b_ids)
+
+
+def generate_delaunay(node_count, seed=0, spacing=GRID_SPACING, jitter=0.25):
+    # Planar triangulation of a jittered grid, every square is split by its
+    # shorter diagonal like a Delaunay triangulation would
+    # jitter up to 0.25 keeps the squares convex so no edges cross
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    columns = max(1, round(node_count**0.5))
+    x, y = _grid_positions(rng, node_count, columns, spacing, jitter)
+
+    index = np.arange(node_count)
+    right = index[(index % columns < columns - 1) & (index + 1 < node_count)]
+    down = index[index + columns < node_count]
+    # Top left corners of the squares
+    corner = right[right + columns + 1 < node_count]
+    main_length = np.hypot(
+        x[corner] - x[corner + columns + 1], y[corner] - y[corner + columns + 1]
+    )
+    anti_length = np.hypot(
+        x[corner + 1] - x[corner + columns], y[corner + 1] - y[corner + columns]
+    )
+    use_main = main_length <= anti_length
+    diagonal_a = np.where(use_main, corner, corner + 1)
+    diagonal_b = np.where(use_main, corner + columns + 1, corner + columns)
+
+    a_ids = np.concatenate((right, down, diagonal_a))
+    b_ids = np.concatenate((right + 1, down + columns, diagonal_b))
+    return _make_columns(x, y, a_ids, b_ids)
+
+
+def generate_geometric(node_count, seed=0, spacing=GRID_SPACING, degree=6.0):
+    # Random geometric graph, nodes closer than a radius are connected
+    # The radius gives about degree neighbours per node
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    x, y = _random_positions(rng, node_count, spacing)
+    radius = spacing * (degree / np.pi) ** 0.5
+
+    # Sort the nodes into square cells of radius, only nodes in the same or
+    # a neighbouring cell can be connected
+    cell_x = ((x - spacing) // radius).astype(np.int64)
+    cell_y = ((y - spacing) // radius).astype(np.int64)
+    cells_x = int(cell_x.max(initial=0)) + 1
+    cells_y = int(cell_y.max(initial=0)) + 1
+    cells = cells_x * cells_y
+    cell = cell_x * cells_y + cell_y
+    order = np.argsort(cell, kind="stable")
+    counts = np.bincount(cell, minlength=cells)
+    starts = np.cumsum(counts) - counts
+
+    a_parts = []
+    b_parts = []
+    index = np.arange(node_count)
+    # The same cell and half of the neighbours, so every pair is seen once
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        valid = (cell_x + dx < cells_x) & (cell_y + dy >= 0) & (cell_y + dy < cells_y)
+        sources = index[valid]
+        other_cell = cell[valid] + dx * cells_y + dy
+        other_counts = counts[other_cell]
+        total = int(other_counts.sum())
+
+        # Every node of the other cell for every source
+        a_ids = np.repeat(sources, other_counts)
+        offsets = np.arange(total) - np.repeat(
+            np.cumsum(other_counts) - other_counts, other_counts
+        )
+        b_ids = order[np.repeat(starts[other_cell], other_counts) + offsets]
+
+        keep = np.hypot(x[a_ids] - x[b_ids], y[a_ids] - y[b_ids]) <= radius
+        if dx == 0 and dy == 0:
+            keep &= a_ids < b_ids
+        a_parts.append(a_ids[keep])
+        b_parts.append(b_ids[keep])
+
+    return _make_columns(x, y, np.concatenate(a_parts), np.concatenate(b_parts))
+
+
+def generate_barabasi_albert(node_count, seed=0, spacing=GRID_SPACING, edges=2):
+    # Scale free graph by preferential attachment, every new node is
+    # connected to edges earlier nodes picked by their degree
+    # Nodes are placed at random, they have no position of their own
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    x, y = _random_positions(rng, node_count, spacing)
+    if node_count < 2:
+        return _make_columns(x, y, np.empty(0, np.int64), np.empty(0, np.int64))
+
+    # Edge i goes from node i // edges + 1 to a random end of an edge added
+    # by an earlier node (Batagelj and Brandes), which picks nodes in
+    # proportion to their degree
+    sources = np.repeat(np.arange(1, node_count, dtype=np.int64), edges)
+    earlier_ends = 2 * (sources - 1) * edges
+    end = (rng.random(len(sources)) * earlier_ends).astype(np.int64)
+    # An even end is the source of edge end // 2, an odd end is its target
+    # which is looked up by following the pointers
+    pointer = np.where(end % 2 == 1, end // 2, -1)
+    targets = np.where(end % 2 == 0, sources[end // 2], -1)
+    # The first node can only connect to node 0
+    pointer[earlier_ends == 0] = -1
+    targets[earlier_ends == 0] = 0
+
+    pending = np.flatnonzero(pointer >= 0)
+    while len(pending):
+        next_pointer = pointer[pointer[pending]]
+        resolved = next_pointer < 0
+        targets[pending[resolved]] = targets[pointer[pending[resolved]]]
+        pointer[pending[resolved]] = -1
+        pointer[pending[~resolved]] = next_pointer[~resolved]
+        pending = pending[~resolved]
+
+    # Picking the same node twice gives fewer than edges edges for a node
+    a_ids, b_ids = _drop_repeated_edges(sources, targets)
+    return _make_columns(x, y, a_ids, b_ids)
+
+
+def generate_regular(node_count, seed=0, spacing=GRID_SPACING, degree=3):
+    # Random regular graph by randomly pairing degree stubs of every node
+    # Self loops and repeated pairs are dropped, so a few nodes end up with
+    # a smaller degree
+    _require_numpy()
+    if node_count * degree % 2:
+        print("Generate Graph Error: node_count * degree must be even")
+        raise Exception("node_count * degree must be even")
+    rng = np.random.default_rng(seed)
+    x, y = _random_positions(rng, node_count, spacing)
+
+    stubs = np.repeat(np.arange(node_count, dtype=np.int64), degree)
+    rng.shuffle(stubs)
+    a_ids, b_ids = _drop_repeated_edges(stubs[0::2], stubs[1::2])
+    return _make_columns(x, y, a_ids, b_ids)
+
+
+GENERATORS = {
+    "grid": generate_grid,
+    "delaunay": generate_delaunay,
+    "geometric": generate_geometric,
+    "barabasi_albert": generate_barabasi_albert,
+    "regular": generate_regular,
+}
+
+
+def generate(kind, node_count, seed=0, **options):
+    generator = GENERATORS.get(kind)
+    if generator is None:
+        print(f"Generate Graph Error: Unknown graph kind {kind}")
+        raise Exception("Unknown graph kind")
+    return generator(node_count, seed, **options)
+
+
+def iter_node_chunks(columns):
+    names = ("node_ids", "node_x", "node_y")
+    return _iter_column_chunks([columns[name] for name in names])
+
+
+def iter_edge_chunks(columns):
+    names = ("edge_ids", "edge_a", "edge_b", "edge_weights")
+    return _iter_column_chunks([columns[name] for name in names])
+
+
+def _iter_column_chunks(columns):
+    # Rows of python numbers for Graph._load_chunks
+    for start in range(0, len(columns[0]), ROWS_PER_CHUNK):
+        yield zip(
+            *(column[start : start + ROWS_PER_CHUNK].tolist() for column in columns)
+        )
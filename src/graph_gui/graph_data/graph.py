@@ -4,11 +4,46 @@ Author: Delano Lourenco
 Repo: https://github.com/3ddelano/graph-visualizer-python
 License: MIT
 """
+
 import os
 import heapq
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from .interfaces.graph_interface import GraphInterface
 from .node import Node
 from .edge import Edge
+from .heuristics import resolve_heuristic
+from .contraction_hierarchy import ContractionHierarchy
+from .shortest_path_tree import ShortestPathTree
+from .all_pairs import all_pairs_shortest_paths
+from .batch_paths import find_shortest_paths
+from .column_store import NodeView, EdgeView
+from .components import ComponentIndex
+from .csr import CSRGraph
+from .search_stats import SearchStats
+from .csv_io import (
+    iter_node_chunks,
+    iter_edge_chunks,
+    pause_gc,
+    write_csv,
+    format_node,
+    format_edge,
+)
+from .binary_io import BinaryGraphFile, is_binary_graph_file, save_binary
+from .mapped_store import MappedStore
+from .journal import start_journal, append_changes, read_journal
+from . import formats, generators
+
+# Max number of shortest path results kept by the path cache
+PATH_CACHE_SIZE = 128
+# Algorithms whose results depend on the node positions
+POSITION_ALGORITHMS = ("astar", "biastar")
+
+# save_incremental saves a new snapshot instead of appending to the journal
+# once the journal has more than this many changes, or more changes than
+# JOURNAL_COMPACT_RATIO times the number of nodes and edges
+JOURNAL_MIN_CHANGES = 10000
+JOURNAL_COMPACT_RATIO = 0.5
 
 
 class Graph(GraphInterface):
@@ -16,17 +51,102 @@ class Graph(GraphInterface):
         self.nodes = []
         self.edges = []
 
+        # Indexes kept in sync with self.nodes and self.edges
+        self._node_map = {}  # node id -> node
+        self._edge_map = {}  # edge id -> edge
+        self._adjacency = {}  # node id -> {neighbour node id -> edge}
+        self._components = ComponentIndex(self)
+        # Set by load_mapped, the indexes and lists above are then lazy views
+        self._mapped_store = None
+
+        # Set while inside batch(), see _end_batch
+        self._batch_depth = 0
+        self._batch_changed = False
+        # id(element) -> element removed in the batch but still in the list
+        self._removed_nodes = {}
+        self._removed_edges = {}
+        # (node id, node id) pairs whose linked edge was removed in the batch
+        self._unlinked_pairs = set()
+
+        # Changes not saved yet by save_incremental, None while not tracked
+        self._changes = None
+        # Node id -> index in self._changes of its pending move_node
+        self._move_indexes = {}
+        # (nodelist, edgelist, journal) paths used by save_incremental
+        self._journal_paths = None
+        # Changes in the journal file, None if it has to be started again
+        self._journal_length = 0
+
+        # Bumped by every method that changes the nodes, edges or weights
+        # Anything derived from the graph is only valid for one version
+        self.version = 0
+        # Bumped when a node moves, only what uses the node positions (the
+        # A* heuristics and the CSR coordinates) is invalidated by it
+        self.positions_version = 0
+
+        # Built by build_contraction_hierarchy for the "ch" algorithm
+        self._contraction_hierarchy = None
+        self._contraction_hierarchy_version = -1
+
+        # Min weight / length ratio of the scaled_euclidean heuristic
+        self._min_weight_ratio = 0.0
+        self._min_weight_ratio_version = None
+
+        # Compressed sparse row snapshot for the current version
+        self._csr = None
+        self._csr_version = None
+
+        # LRU cache of shortest path results for the current version
+        self._path_cache = OrderedDict()
+        self._path_cache_version = 0
+        self._path_cache_positions_version = 0
+        self.path_cache_hits = 0
+        self.path_cache_misses = 0
+
+        # Called with a message and the SearchStats after every search,
+        # e.g. graph.search_logger = lambda message, stats: print(message)
+        self.search_logger = None
+
     # ----------
     # Node Methods
     # ----------
 
     def add_node(self, node):
-        self.nodes.append(node)
+        self._bump_version()
+        if self._removed_nodes.pop(id(node), None) is None:
+            self.nodes.append(node)
+        # Else it was removed in this batch and is still in self.nodes
+        self._node_map[node.id] = node
+        self._adjacency.setdefault(node.id, {})
+        self._components.add_node(node.id)
+        self._record("add_node", node.id, node.pos[0], node.pos[1])
+
+    def add_nodes(self, nodes):
+        with self.batch():
+            for node in nodes:
+                self.add_node(node)
 
     def delete_node(self, node_or_id):
-        node = self.resolve_node(node_or_id)
-        if node:
-            self.nodes.remove(node)
+        self.remove_nodes([node_or_id])
+
+    def remove_nodes(self, nodes_or_ids):
+        # Also deletes the connected edges so no edge points to a missing node
+        with self.batch():
+            for node_or_id in nodes_or_ids:
+                node = self.resolve_node(node_or_id)
+                if not node:
+                    continue
+                node = self._node_map.get(node.id)
+                if node is None:
+                    continue
+
+                self.remove_edges(list(self._adjacency.get(node.id, {}).values()))
+                del self._node_map[node.id]
+                self._adjacency.pop(node.id, None)
+                self._removed_nodes[id(node)] = node
+                self._components.mark_dirty()
+                self._bump_version()
+                self._record("delete_node", node.id)
 
     def get_adjacent_nodes(self, node_or_id):
         node = self.resolve_node(node_or_id)
@@ -34,55 +154,80 @@ class Graph(GraphInterface):
             return []
 
         connected_nodes = []
-
-        for edge in self.edges:
-            if edge.nodeA == node:
+        for edge in self._adjacency.get(node.id, {}).values():
+            if edge.nodeA.id == node.id:
                 connected_nodes.append(edge.nodeB)
-            elif edge.nodeB == node:
+            else:
                 connected_nodes.append(edge.nodeA)
 
         return connected_nodes
 
     def get_node_by_id(self, node_id):
-        for node in self.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self._node_map.get(node_id)
+
+    def update_node_position(self, node_or_id, x, y):
+        node = self.resolve_node(node_or_id)
+        if node:
+            self.positions_version += 1
+            node.pos[0] = x
+            node.pos[1] = y
+            self._record("move_node", node.id, x, y)
 
     # ----------
     # Edge Methods
     # ----------
 
     def add_edge(self, edge):
-        self.edges.append(edge)
+        self._bump_version()
+        if self._removed_edges.pop(id(edge), None) is None:
+            self.edges.append(edge)
+        # Else it was removed in this batch and is still in self.edges
+        self._edge_map[edge.id] = edge
+        self._link_edge(edge)
+        self._components.add_edge(edge.nodeA.id, edge.nodeB.id)
+        self._record("add_edge", edge.id, edge.nodeA.id, edge.nodeB.id, edge.weight)
+
+    def add_edges(self, edges):
+        with self.batch():
+            for edge in edges:
+                self.add_edge(edge)
 
     def update_edge_weight(self, edge_or_id, weight):
         edge = self.resolve_edge(edge_or_id)
         if edge:
+            self._bump_version()
             edge.weight = weight
+            self._record("update_edge_weight", edge.id, weight)
 
     def delete_edge(self, edge_or_id):
-        edge = self.resolve_edge(edge_or_id)
-        self.edges.remove(edge)
+        self.remove_edges([edge_or_id])
+
+    def remove_edges(self, edges_or_ids):
+        with self.batch():
+            for edge_or_id in edges_or_ids:
+                edge = self.resolve_edge(edge_or_id)
+                if not edge:
+                    continue
+                edge = self._edge_map.get(edge.id)
+                if edge is None:
+                    continue
+
+                del self._edge_map[edge.id]
+                self._unlink_edge(edge)
+                self._removed_edges[id(edge)] = edge
+                self._components.mark_dirty()
+                self._bump_version()
+                self._record("delete_edge", edge.id)
 
     def get_adjacent_edges(self, node_or_id):
         node = self.resolve_node(node_or_id)
         if not node:
             return []
 
-        connected_edges = []
-
-        for edge in self.edges:
-            if edge.nodeA == node or edge.nodeB == node:
-                connected_edges.append(edge)
-
-        return connected_edges
+        return list(self._adjacency.get(node.id, {}).values())
 
     def get_edge_by_id(self, edge_id):
-        for edge in self.edges:
-            if edge.id == edge_id:
-                return edge
-        return None
+        return self._edge_map.get(edge_id)
 
     def get_edge_between_nodes(self, nodeA_or_id, nodeB_or_id):
         nodeA = self.resolve_node(nodeA_or_id)
@@ -90,28 +235,259 @@ class Graph(GraphInterface):
         if not nodeA or not nodeB:
             return None
 
+        return self._adjacency.get(nodeA.id, {}).get(nodeB.id)
+
+    # ----------
+    # Index Methods
+    # ----------
+
+    def _link_edge(self, edge):
+        idA = edge.nodeA.id
+        idB = edge.nodeB.id
+        # Keep the first edge added between two nodes like the old linear scan did
+        self._adjacency.setdefault(idA, {}).setdefault(idB, edge)
+        self._adjacency.setdefault(idB, {}).setdefault(idA, edge)
+
+    def _unlink_edge(self, edge):
+        idA = edge.nodeA.id
+        idB = edge.nodeB.id
+        for from_id, to_id in ((idA, idB), (idB, idA)):
+            neighbours = self._adjacency.get(from_id)
+            if neighbours is not None and neighbours.get(to_id) is edge:
+                del neighbours[to_id]
+                # A parallel edge between the nodes is linked when the batch ends
+                self._unlinked_pairs.add((from_id, to_id))
+
+    def _relink_parallel_edges(self):
+        # Link the first remaining edge of every pair that lost its edge
+        pairs = self._unlinked_pairs
+        self._unlinked_pairs = set()
+        if self._mapped_store is not None:
+            # Going through every edge would load all of them
+            for node_id in {from_id for from_id, _to_id in pairs}:
+                self._adjacency.reload(node_id)
+            return
+
+        for edge in self._edge_map.values():
+            if (edge.nodeA.id, edge.nodeB.id) in pairs:
+                self._link_edge(edge)
+
+    def rebuild_indexes(self):
+        # Rebuild the lookup maps from self.nodes and self.edges
+        # Needed whenever the lists are replaced directly
+        self.nodes = list(self.nodes)
+        self.edges = list(self.edges)
+        node_map = {node.id: node for node in self.nodes}
+        edge_map = {edge.id: edge for edge in self.edges}
+        adjacency = {node.id: {} for node in self.nodes}
+        self._set_contents(self.nodes, self.edges, node_map, edge_map, adjacency)
         for edge in self.edges:
-            if (edge.nodeA == nodeA and edge.nodeB == nodeB) or (
-                edge.nodeA == nodeB and edge.nodeB == nodeA
-            ):
-                return edge
-        return None
+            self._link_edge(edge)
+
+    def _set_contents(
+        self, nodes, edges, node_map, edge_map, adjacency, mapped_store=None
+    ):
+        # Replace the whole graph with already indexed nodes and edges
+        if self._mapped_store is not None and self._mapped_store is not mapped_store:
+            self._mapped_store.close()
+        self._mapped_store = mapped_store
+        # The journal belongs to the replaced contents
+        self._changes = None
+        self._move_indexes = {}
+        self._journal_paths = None
+        self.nodes = nodes
+        self.edges = edges
+        self._node_map = node_map
+        self._edge_map = edge_map
+        self._adjacency = adjacency
+        self._components.mark_dirty()
+        self._bump_version()
+
+    def clear(self):
+        self.nodes = []
+        self.edges = []
+        self.rebuild_indexes()
+
+    def _bump_version(self):
+        # Also bumped inside a batch, so a query in the batch never gets a
+        # cached result from before the change
+        self.version += 1
+        if self._batch_depth > 0 and not self._batch_changed:
+            # The component index is rebuilt from the maps on the next query
+            # instead of being updated by every change of the batch
+            self._batch_changed = True
+            self._components.mark_dirty()
+
+    @contextmanager
+    def batch(self):
+        # Groups many changes together
+        # Removed nodes and edges stay in self.nodes / self.edges until the
+        # outermost batch ends
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._end_batch()
+
+    def _end_batch(self):
+        if self._mapped_store is not None:
+            # The lists are views of the maps which are already up to date
+            self._removed_nodes = {}
+            self._removed_edges = {}
+        if self._removed_nodes:
+            removed = self._removed_nodes
+            self.nodes = [node for node in self.nodes if id(node) not in removed]
+            self._removed_nodes = {}
+        if self._removed_edges:
+            removed = self._removed_edges
+            self.edges = [edge for edge in self.edges if id(edge) not in removed]
+            self._removed_edges = {}
+        if self._unlinked_pairs:
+            self._relink_parallel_edges()
+
+        if self._batch_changed:
+            # self.nodes and self.edges changed
+            self._batch_changed = False
+            self._bump_version()
+
+    def _record(self, *change):
+        # Remember a change for the next save_incremental
+        if self._changes is None:
+            return
+        if change[0] == "move_node":
+            # Only the last position of a moved node is needed, also when an
+            # edge drag moves its two nodes in turn
+            index = self._move_indexes.get(change[1])
+            if index is not None:
+                self._changes[index] = change
+                return
+            self._move_indexes[change[1]] = len(self._changes)
+        elif change[0] in ("add_node", "delete_node"):
+            # Later moves of the node must come after this change
+            self._move_indexes.pop(change[1], None)
+        self._changes.append(change)
+
+    # ----------
+    # Snapshot Methods
+    # ----------
+
+    def freeze(self):
+        # Immutable CSR snapshot, reused until the graph changes
+        versions = (self.version, self.positions_version)
+        if self._csr is None or self._csr_version != versions:
+            self._csr = CSRGraph(self)
+            self._csr_version = versions
+        return self._csr
+
+    def build_path_from_ids(self, node_ids, edge_ids):
+        # Turn a CSRGraph search result into the find_shortest_path format
+        if len(node_ids) < 2:
+            return None
+
+        ret = [[node_ids[0], None]]
+        for i in range(1, len(node_ids)):
+            ret.append([node_ids[i], self.get_edge_by_id(edge_ids[i - 1])])
+        return ret
+
+    # ----------
+    # Component Methods
+    # ----------
+
+    def connected_components(self):
+        # List of lists of node ids, one list per connected component
+        return self._components.get_components()
+
+    def is_connected(self, nodeA_or_id, nodeB_or_id):
+        nodeA = self.resolve_node(nodeA_or_id)
+        nodeB = self.resolve_node(nodeB_or_id)
+        if not nodeA or not nodeB:
+            return False
+        return self._components.is_connected(nodeA.id, nodeB.id)
+
+    # ----------
+    # Path Cache Methods
+    # ----------
+
+    def _get_cached_path(self, key):
+        if self._path_cache_version != self.version:
+            # The graph changed since the results were cached
+            self._path_cache.clear()
+            self._path_cache_version = self.version
+            self._path_cache_positions_version = self.positions_version
+        elif self._path_cache_positions_version != self.positions_version:
+            # A node moved, only the results of the heuristic searches change
+            for cached_key in list(self._path_cache):
+                if cached_key[0] in POSITION_ALGORITHMS:
+                    del self._path_cache[cached_key]
+            self._path_cache_positions_version = self.positions_version
+
+        result = self._path_cache.get(key)
+        if result is None:
+            self.path_cache_misses += 1
+            return None
+
+        self.path_cache_hits += 1
+        self._path_cache.move_to_end(key)
+        return self._copy_path_result(result)
+
+    def _set_cached_path(self, key, result):
+        self._path_cache[key] = self._copy_path_result(result)
+        self._path_cache.move_to_end(key)
+        while len(self._path_cache) > PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+
+    def _copy_path_result(self, result):
+        # Callers such as PathAnimation modify the returned lists
+        copy = dict(result)
+        for key in ("final_path", "visited_nodes", "visited_edges"):
+            if copy.get(key) is not None:
+                copy[key] = list(copy[key])
+        # A cached result keeps the stats of the search that found it
+        return copy
+
+    def clear_path_cache(self):
+        self._path_cache.clear()
+
+    def get_path_cache_info(self):
+        return {
+            "hits": self.path_cache_hits,
+            "misses": self.path_cache_misses,
+            "size": len(self._path_cache),
+            "max_size": PATH_CACHE_SIZE,
+        }
 
     # ----------
     # Pathfinding Methods
     # ----------
 
-    def find_shortest_path(self, algorithm, start_node_or_id, end_node_or_id):
+    def find_shortest_path(
+        self, algorithm, start_node_or_id, end_node_or_id, heuristic="euclidean"
+    ):
         found_path = self._get_shortest_path(
-            algorithm, start_node_or_id, end_node_or_id
+            algorithm, start_node_or_id, end_node_or_id, heuristic
         )
         if found_path:
             return found_path["final_path"]
 
-    def animate_shortest_path(self, algorithm, start_node_or_id, end_node_or_id):
-        return self._get_shortest_path(algorithm, start_node_or_id, end_node_or_id)
+    def find_shortest_paths(
+        self, pairs, algorithm="dijkstra", workers=1, heuristic="euclidean"
+    ):
+        # Generator of (start id, end id, path) for many (start, end) pairs
+        # Pairs sharing a start node are answered by one search where possible
+        return find_shortest_paths(self, pairs, algorithm, heuristic, workers)
+
+    def animate_shortest_path(
+        self, algorithm, start_node_or_id, end_node_or_id, heuristic="euclidean"
+    ):
+        return self._get_shortest_path(
+            algorithm, start_node_or_id, end_node_or_id, heuristic
+        )
 
-    def _get_shortest_path(self, algorithm, start_node_or_id, end_node_or_id):
+    def _get_shortest_path(
+        self, algorithm, start_node_or_id, end_node_or_id, heuristic="euclidean"
+    ):
         start_node = self.resolve_node(start_node_or_id)
         end_node = self.resolve_node(end_node_or_id)
 
@@ -119,10 +495,42 @@ class Graph(GraphInterface):
             print("Invalid start or end node to find shortest path")
             return None
 
+        # Components of a mapped graph would load every edge, the search
+        # finds out instead
+        if self._mapped_store is None and not self._components.is_connected(
+            start_node.id, end_node.id
+        ):
+            # Different components, no search needed
+            stats = SearchStats(algorithm)
+            stats.end_phase("components")
+            return {
+                "final_path": None,
+                "visited_nodes": [],
+                "visited_edges": [],
+                "stats": stats,
+            }
+
+        key = (algorithm, start_node.id, end_node.id, heuristic)
+        result = self._get_cached_path(key)
+        if result is None:
+            result = self._run_path_algorithm(
+                algorithm, start_node, end_node, heuristic
+            )
+            if result is not None:
+                self._set_cached_path(key, result)
+        return result
+
+    def _run_path_algorithm(self, algorithm, start_node, end_node, heuristic):
         if algorithm == "dijkstra":
             return self.dijkstra(start_node, end_node)
         elif algorithm == "astar":
-            return self.astar(start_node, end_node)
+            return self.astar(start_node, end_node, heuristic)
+        elif algorithm == "bidijkstra":
+            return self.bidijkstra(start_node, end_node)
+        elif algorithm == "biastar":
+            return self.biastar(start_node, end_node, heuristic)
+        elif algorithm == "ch":
+            return self.ch(start_node, end_node)
         elif algorithm == "bfs":
             return self.bfs(start_node, end_node)
         elif algorithm == "dfs":
@@ -131,6 +539,89 @@ class Graph(GraphInterface):
             print("Invalid algorithm to find shortest path")
             return None
 
+    def shortest_path_tree(self, source_node_or_id, targets=None, algorithm="dijkstra"):
+        # One search from the source node to every node, or until all the
+        # targets are settled
+        source_node = self.resolve_node(source_node_or_id)
+        if not source_node:
+            print("Invalid source node to build shortest path tree")
+            return None
+
+        remaining = None
+        if targets is not None:
+            remaining = set()
+            for target in targets:
+                target_node = self.resolve_node(target)
+                if target_node:
+                    remaining.add(target_node.id)
+
+        if algorithm == "dijkstra":
+            dist, path = self._dijkstra_tree(source_node, remaining)
+        elif algorithm == "bfs":
+            dist, path = self._bfs_tree(source_node, remaining)
+        else:
+            print("Invalid algorithm to build shortest path tree")
+            return None
+
+        return ShortestPathTree(self, source_node, dist, path)
+
+    def _dijkstra_tree(self, source_node, remaining):
+        dist = {source_node.id: 0}
+        path = {source_node.id: None}
+        settled = set()
+
+        heap = [(0, source_node.id)]
+        while heap:
+            cur_dist, cur_node_id = heapq.heappop(heap)
+            if cur_node_id in settled:
+                continue
+            settled.add(cur_node_id)
+
+            if remaining is not None:
+                remaining.discard(cur_node_id)
+                if not remaining:
+                    break
+
+            for adj_node_id, edge in self._adjacency.get(cur_node_id, {}).items():
+                if adj_node_id in settled:
+                    continue
+                new_dist = cur_dist + edge.weight
+                if new_dist < dist.get(adj_node_id, float("inf")):
+                    dist[adj_node_id] = new_dist
+                    path[adj_node_id] = cur_node_id
+                    heapq.heappush(heap, (new_dist, adj_node_id))
+
+        # Only keep the distances and paths that are final
+        dist = {node_id: dist[node_id] for node_id in settled}
+        path = {node_id: path[node_id] for node_id in settled}
+        return dist, path
+
+    def _bfs_tree(self, source_node, remaining):
+        # Distances are the number of edges from the source node
+        dist = {source_node.id: 0}
+        path = {source_node.id: None}
+
+        queue = deque([source_node.id])
+        if remaining is not None:
+            remaining.discard(source_node.id)
+        while queue and (remaining is None or remaining):
+            cur_node_id = queue.popleft()
+            for adj_node_id in self._adjacency.get(cur_node_id, {}):
+                if adj_node_id in dist:
+                    continue
+                dist[adj_node_id] = dist[cur_node_id] + 1
+                path[adj_node_id] = cur_node_id
+                queue.append(adj_node_id)
+                if remaining is not None:
+                    remaining.discard(adj_node_id)
+
+        return dist, path
+
+    def all_pairs_shortest_paths(self, backend="auto", workers=None):
+        # backend is "floyd_warshall" (numpy, dense graphs), "dijkstra" (one
+        # search per node spread over worker processes) or "auto"
+        return all_pairs_shortest_paths(self, backend, workers)
+
     def get_euclidean_distance(self, nodeA, nodeB):
         x1 = nodeA.pos[0]
         y1 = nodeA.pos[1]
@@ -145,196 +636,456 @@ class Graph(GraphInterface):
         y2 = nodeB.pos[1]
         return abs(x1 - x2) + abs(y1 - y2)
 
-    def dijkstra(self, start_node, end_node):
-        dist = {}
+    def get_min_weight_ratio(self):
+        # Smallest weight / length ratio over all edges
+        # Scaling the euclidean distance by it gives an admissible heuristic
+        # Cached, since every scaled_euclidean search asks for it
+        versions = (self.version, self.positions_version)
+        if self._min_weight_ratio_version != versions:
+            self._min_weight_ratio = self._compute_min_weight_ratio()
+            self._min_weight_ratio_version = versions
+        return self._min_weight_ratio
+
+    def _compute_min_weight_ratio(self):
+        ratio = None
+        for edge in self.edges:
+            length = self.get_euclidean_distance(edge.nodeA, edge.nodeB)
+            if length == 0:
+                continue
+            edge_ratio = edge.weight / length
+            if ratio is None or edge_ratio < ratio:
+                ratio = edge_ratio
+
+        if ratio is None:
+            return 0.0
+        return max(ratio, 0.0)
+
+    def _finish_search(
+        self, stats, path, start_node, end_node, visited_nodes, visited_edges
+    ):
+        # Result of a search with the final path built from path
+        # path is None when the search ran out of nodes, like A* reports it
+        stats.end_phase("search")
+        if path is None:
+            final_path = []
+        else:
+            final_path = self.build_path(path, start_node, end_node)
+        stats.end_phase("build_path")
 
-        # Initialize distances to infinity
-        for node in self.nodes:
-            dist[node.id] = 1e7
+        if self.search_logger is not None:
+            if final_path:
+                message = f"Reached the goal node in {stats.algorithm}"
+            else:
+                message = f"No path found in {stats.algorithm}"
+            self.search_logger(message, stats)
+        return {
+            "final_path": final_path,
+            "visited_nodes": visited_nodes,
+            "visited_edges": visited_edges,
+            "stats": stats,
+        }
 
-        dist[start_node.id] = 0
-        cur_node = start_node
+    def dijkstra(self, start_node, end_node):
+        stats = SearchStats("dijkstra")
+        dist = {start_node.id: 0}
 
         path = {}
         path[start_node.id] = None
 
-        cur_node = start_node
         visited_nodes = []
         visited_edges = []
-        while cur_node:
+        settled = set()
+
+        # Min heap of (distance, push order, node)
+        # Stale entries are skipped when popped instead of being removed
+        counter = 0
+        pops = 0
+        relaxed = 0
+        peak_frontier = 1
+        heap = [(0, counter, start_node)]
+        while heap:
+            cur_dist, _, cur_node = heapq.heappop(heap)
+            pops += 1
+            if cur_node.id in settled:
+                continue
+
+            settled.add(cur_node.id)
             visited_nodes.append(cur_node.id)
-            for adj_node in self.get_adjacent_nodes(cur_node):
-                if adj_node.id in visited_nodes:
+            if cur_node.id == end_node.id:
+                # Reached the goal node
+                break
+
+            for adj_node_id, edge in self._adjacency.get(cur_node.id, {}).items():
+                if adj_node_id in settled:
                     continue
-                edge = self.get_edge_between_nodes(cur_node, adj_node)
-                visited_edges.append([cur_node.id, adj_node.id, edge])
-                edge_cost = edge.weight
+                adj_node = edge.nodeB if edge.nodeA.id == cur_node.id else edge.nodeA
+                visited_edges.append([cur_node.id, adj_node_id, edge])
 
                 # Relaxation
-                if dist[cur_node.id] + edge_cost < dist[adj_node.id]:
-                    dist[adj_node.id] = dist[cur_node.id] + edge_cost
-                    path[adj_node.id] = cur_node.id
-                else:
-                    path[adj_node.id] = edge_cost
-
-            # Find the next node to visit (the one with least cost from the starting node)
-            dist_list = []
-            for node_id, d in dist.items():
-                if not node_id in visited_nodes:
-                    dist_list.append([node_id, d])
-            dist_list = sorted(dist_list, key=lambda x: x[1])
+                relaxed += 1
+                new_dist = cur_dist + edge.weight
+                if new_dist < dist.get(adj_node_id, float("inf")):
+                    dist[adj_node_id] = new_dist
+                    path[adj_node_id] = cur_node.id
+                    counter += 1
+                    heapq.heappush(heap, (new_dist, counter, adj_node))
+            if len(heap) > peak_frontier:
+                peak_frontier = len(heap)
+
+        stats.nodes_expanded = len(visited_nodes)
+        stats.edges_relaxed = relaxed
+        stats.heap_pushes = counter + 1
+        stats.heap_pops = pops
+        stats.peak_frontier = peak_frontier
+        return self._finish_search(
+            stats, path, start_node, end_node, visited_nodes, visited_edges
+        )
 
-            if len(dist_list) == 0:
-                cur_node = None
-            else:
-                cur_node_id = dist_list[0][0]
-                cur_node = self.get_node_by_id(cur_node_id)
+    def astar(self, start_node, end_node, heu_func="euclidean"):
+        stats = SearchStats("astar")
+        heuristic = resolve_heuristic(self, heu_func, end_node)
+        stats.end_phase("heuristic_setup")
+        heu = {}  # h_score cache, each node is estimated at most once
 
-        return {
-            "final_path": self.build_path(path, start_node, end_node),
-            "visited_nodes": visited_nodes,
-            "visited_edges": visited_edges,
-        }
+        g_scores = {start_node.id: 0}
+        heu[start_node.id] = heuristic(start_node)
 
-    def astar(self, start_node, end_node, heu_func="euclidean"):
         path = {}
+        path[start_node.id] = None
 
-        g_scores = {node.id: float("inf") for node in self.nodes}  # g_score
-        g_scores[start_node.id] = 0
+        visited_nodes = []
+        visited_edges = []
+        closed = set()
+
+        # Min heap of (f_score, -g_score, push order, node)
+        # Ties on f_score prefer the deeper node, then the earlier push
+        # Outdated entries are skipped when popped (lazy decrease-key)
+        counter = 0
+        pops = 0
+        relaxed = 0
+        peak_frontier = 1
+        openset = [(heu[start_node.id], 0, counter, start_node)]
+
+        while openset:
+            _f_score, neg_g_score, _, current_node = heapq.heappop(openset)
+            pops += 1
+            if current_node.id in closed or -neg_g_score > g_scores[current_node.id]:
+                continue
 
-        # Straight line distance from any node to the end node
-        heu = {}  # h_score
-        if heu_func == "euclidean":
-            heu = {
-                node.id: self.get_euclidean_distance(node, end_node)
-                for node in self.nodes
-            }
-        elif heu_func == "manhattan":
-            heu = {
-                node.id: self.get_manhattan_distance(node, end_node)
-                for node in self.nodes
-            }
+            # Visiting the node with id=current_node.id
+            visited_nodes.append(current_node.id)
+            if current_node.id == end_node.id:
+                # Reached the goal
+                break
+            closed.add(current_node.id)
+            current_g_score = g_scores[current_node.id]
+
+            for node_id, edge in self._adjacency.get(current_node.id, {}).items():
+                relaxed += 1
+                temp_g_score = current_g_score + edge.weight
+                if temp_g_score >= g_scores.get(node_id, float("inf")):
+                    continue
+
+                node = edge.nodeB if edge.nodeA.id == current_node.id else edge.nodeA
+                if node_id not in closed:
+                    visited_edges.append([current_node.id, node_id, edge])
+                else:
+                    # Found a cheaper way to a closed node, only possible
+                    # with an inconsistent heuristic, so reopen it
+                    closed.discard(node_id)
+
+                if node_id not in heu:
+                    heu[node_id] = heuristic(node)
+
+                g_scores[node_id] = temp_g_score
+                path[node_id] = current_node.id
+                counter += 1
+                heapq.heappush(
+                    openset,
+                    (temp_g_score + heu[node_id], -temp_g_score, counter, node),
+                )
+            if len(openset) > peak_frontier:
+                peak_frontier = len(openset)
         else:
-            print("Invalid heuristic function in A*")
-            raise Exception("Invalid heuristic function in A*")
-        f_scores = {}
-        f_scores[start_node.id] = g_scores[start_node.id] + heu[start_node.id]
-        openset = []  # f_score stored in a min heap
-        heapq.heappush(openset, (heu[start_node.id], start_node))
+            # No path found
+            path = None
+
+        stats.nodes_expanded = len(visited_nodes)
+        stats.edges_relaxed = relaxed
+        stats.heap_pushes = counter + 1
+        stats.heap_pops = pops
+        stats.peak_frontier = peak_frontier
+        return self._finish_search(
+            stats, path, start_node, end_node, visited_nodes, visited_edges
+        )
+
+    def bidijkstra(self, start_node, end_node):
+        return self._bidirectional_search(
+            start_node, end_node, None, SearchStats("bidijkstra")
+        )
+
+    def biastar(self, start_node, end_node, heu_func="euclidean"):
+        stats = SearchStats("biastar")
+        to_end = resolve_heuristic(self, heu_func, end_node)
+        to_start = resolve_heuristic(self, heu_func, start_node)
+
+        # Average of the two heuristics so that both searches work on the
+        # same reduced edge costs and the meeting point rule stays exact
+        def potential(node):
+            return (to_end(node) - to_start(node)) * 0.5
+
+        stats.end_phase("heuristic_setup")
+        return self._bidirectional_search(start_node, end_node, potential, stats)
+
+    def _bidirectional_search(self, start_node, end_node, potential, stats):
+        # Index 0 is the search from the start node, 1 from the end node
+        directions = ["forward", "backward"]
+        signs = [1, -1]
+        dists = [{start_node.id: 0}, {end_node.id: 0}]
+        paths = [{start_node.id: None}, {end_node.id: None}]
+        settled = [set(), set()]
+        potentials = {}
+
+        def get_key(side, node, dist):
+            if potential is None:
+                return dist
+            if node.id not in potentials:
+                potentials[node.id] = potential(node)
+            return dist + signs[side] * potentials[node.id]
+
+        counter = 0
+        heaps = [
+            [(get_key(0, start_node, 0), 0, start_node)],
+            [(get_key(1, end_node, 0), 0, end_node)],
+        ]
+
+        # Length of the best path seen so far and the node where it meets
+        best_dist = float("inf")
+        meeting_node_id = None
+        if start_node.id == end_node.id:
+            best_dist = 0
+            meeting_node_id = start_node.id
 
         visited_nodes = []
         visited_edges = []
+        pops = 0
+        relaxed = 0
+        peak_frontier = 2
 
-        while len(openset) > 0:
-            _f_score, current_node = heapq.heappop(openset)
-            if current_node == end_node:
-                # Reached the goal
-                print("Reached the goal node in A*")
-                return {
-                    "final_path": self.build_path(path, start_node, end_node),
-                    "visited_nodes": visited_nodes,
-                    "visited_edges": visited_edges,
-                }
-
-            # Visiting the node with id=current_node.id
-            visited_nodes.append(current_node.id)
-            for node in self.get_adjacent_nodes(current_node.id):
-                # Get the edge between cur_noed and each neighbour
-                edge = self.get_edge_between_nodes(current_node.id, node.id)
+        while heaps[0] and heaps[1]:
+            # Stop once neither search can improve on the best path
+            if heaps[0][0][0] + heaps[1][0][0] >= best_dist:
+                break
 
-                temp_g_score = g_scores[current_node.id] + edge.weight
-                temp_f_score = temp_g_score + heu[node.id]
+            # Expand the side with the smaller key
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            other = 1 - side
+            _key, _, cur_node = heapq.heappop(heaps[side])
+            pops += 1
+            if cur_node.id in settled[side]:
+                continue
 
-                visited_edges.append([current_node.id, node.id, edge])
+            settled[side].add(cur_node.id)
+            visited_nodes.append(cur_node.id)
+            cur_dist = dists[side][cur_node.id]
 
-                if node.id in visited_nodes and temp_f_score >= g_scores[node.id]:
+            for adj_node_id, edge in self._adjacency.get(cur_node.id, {}).items():
+                if adj_node_id in settled[side]:
                     continue
+                adj_node = edge.nodeB if edge.nodeA.id == cur_node.id else edge.nodeA
+                visited_edges.append([cur_node.id, adj_node_id, edge, directions[side]])
 
-                if not node.id in visited_nodes or temp_f_score < f_scores[node.id]:
-                    g_scores[node.id] = temp_g_score
-                    f_scores[node.id] = temp_f_score
-                    path[node.id] = current_node.id
+                # Relaxation
+                relaxed += 1
+                new_dist = cur_dist + edge.weight
+                if new_dist < dists[side].get(adj_node_id, float("inf")):
+                    dists[side][adj_node_id] = new_dist
+                    paths[side][adj_node_id] = cur_node.id
+                    counter += 1
+                    heapq.heappush(
+                        heaps[side],
+                        (get_key(side, adj_node, new_dist), counter, adj_node),
+                    )
 
-                    if not (f_scores[node.id], node) in openset:
-                        heapq.heappush(openset, (f_scores[node.id], node))
+                # Check if the two searches meet through this edge
+                if adj_node_id in dists[other]:
+                    total = new_dist + dists[other][adj_node_id]
+                    if total < best_dist:
+                        best_dist = total
+                        meeting_node_id = adj_node_id
+            if len(heaps[0]) + len(heaps[1]) > peak_frontier:
+                peak_frontier = len(heaps[0]) + len(heaps[1])
+
+        stats.nodes_expanded = len(visited_nodes)
+        stats.edges_relaxed = relaxed
+        stats.heap_pushes = counter + 2
+        stats.heap_pops = pops
+        stats.peak_frontier = peak_frontier
+
+        # Join the two halves into a single path towards the start node
+        path = dict(paths[0])
+        if meeting_node_id is not None and meeting_node_id in dists[0]:
+            cur_node_id = meeting_node_id
+            while paths[1][cur_node_id] is not None:
+                next_node_id = paths[1][cur_node_id]
+                path[next_node_id] = cur_node_id
+                cur_node_id = next_node_id
+        else:
+            path.pop(end_node.id, None)
 
-        # No path found
-        print("No path found in A*")
-        return {
-            "final_path": [],
-            "visited_nodes": visited_nodes,
-            "visited_edges": visited_edges,
-        }
+        return self._finish_search(
+            stats, path, start_node, end_node, visited_nodes, visited_edges
+        )
+
+    def build_contraction_hierarchy(self):
+        # Preprocess the graph so that "ch" queries only search upwards
+        # This can take a while on large graphs, so it is never done inside
+        # a query, call it after the last edit
+        print("Building contraction hierarchy")
+        self._contraction_hierarchy = ContractionHierarchy(self)
+        self._contraction_hierarchy_version = self.version
+
+        # Cached "ch" results may come from the bidijkstra fallback
+        for cached_key in list(self._path_cache):
+            if cached_key[0] == "ch":
+                del self._path_cache[cached_key]
+        return self._contraction_hierarchy
+
+    def has_contraction_hierarchy(self):
+        # Whether the hierarchy was built for the current version
+        return (
+            self._contraction_hierarchy is not None
+            and self._contraction_hierarchy_version == self.version
+        )
+
+    def ch(self, start_node, end_node):
+        if not self.has_contraction_hierarchy():
+            # Missing or built before the last edit, answer with bidijkstra
+            # which finds paths of the same length without preprocessing
+            return self._bidirectional_search(
+                start_node, end_node, None, SearchStats("ch (bidijkstra fallback)")
+            )
+
+        stats = SearchStats("ch")
+        result = self._contraction_hierarchy.query(start_node, end_node, stats)
+
+        # Unpacked node ids map back to the real edges in build_path
+        path = {start_node.id: None}
+        node_ids = result["node_ids"]
+        for i in range(1, len(node_ids)):
+            path[node_ids[i]] = node_ids[i - 1]
+
+        return self._finish_search(
+            stats,
+            path,
+            start_node,
+            end_node,
+            result["visited_nodes"],
+            result["visited_edges"],
+        )
 
     def bfs(self, start_node, end_node):
+        stats = SearchStats("bfs")
         visited_nodes = []
         visited_edges = []
+        visited = set()
 
-        queue = []
-        queue.append(start_node)
+        queue = deque([start_node])
+        pushes = 1
+        pops = 0
+        relaxed = 0
+        peak_frontier = 1
         path = {}
         while queue:
-            cur_node = queue.pop(0)
+            cur_node = queue.popleft()
+            pops += 1
+            if cur_node.id in visited:
+                # Queued again by another node before it was visited
+                continue
+            visited.add(cur_node.id)
             visited_nodes.append(cur_node.id)
-            if cur_node == end_node:
+            if cur_node.id == end_node.id:
                 # Reached end node
                 break
 
-            for adj_node in self.get_adjacent_nodes(cur_node):
-                if adj_node.id in visited_nodes:
+            for adj_node_id, edge in self._adjacency.get(cur_node.id, {}).items():
+                relaxed += 1
+                if adj_node_id in visited:
                     continue
 
-                edge = self.get_edge_between_nodes(cur_node, adj_node)
-                visited_edges.append([cur_node.id, adj_node.id, edge])
-                path[adj_node.id] = cur_node.id
-                if adj_node == end_node:
-                    queue = []
+                adj_node = edge.nodeB if edge.nodeA.id == cur_node.id else edge.nodeA
+                visited_edges.append([cur_node.id, adj_node_id, edge])
+                path[adj_node_id] = cur_node.id
+                if adj_node_id == end_node.id:
+                    queue.clear()
                     break
                 queue.append(adj_node)
-
-        return {
-            "final_path": self.build_path(path, start_node, end_node),
-            "visited_nodes": visited_nodes,
-            "visited_edges": visited_edges,
-        }
+                pushes += 1
+            if len(queue) > peak_frontier:
+                peak_frontier = len(queue)
+
+        stats.nodes_expanded = len(visited_nodes)
+        stats.edges_relaxed = relaxed
+        stats.heap_pushes = pushes
+        stats.heap_pops = pops
+        stats.peak_frontier = peak_frontier
+        return self._finish_search(
+            stats, path, start_node, end_node, visited_nodes, visited_edges
+        )
 
     def dfs(self, start_node, end_node):
+        stats = SearchStats("dfs")
         visited_nodes = []
         visited_edges = []
-
-        stack = []
-        stack.append(start_node)
+        # node id -> index in visited_nodes
+        visit_order = {}
+
+        stack = [start_node]
+        pushes = 1
+        pops = 0
+        relaxed = 0
+        peak_frontier = 1
         path = {}
         while stack:
-            cur_node = stack[-1]
-            stack.pop()
-
-            if not cur_node.id in visited_nodes:
-                for visited_node_id in visited_nodes:
-                    edge = self.get_edge_between_nodes(
-                        cur_node, self.get_node_by_id(visited_node_id)
-                    )
-                    if edge:
-                        visited_edges.append([visited_node_id, cur_node.id, edge])
-                        path[cur_node.id] = visited_node_id
-
-                visited_nodes.append(cur_node.id)
-                if cur_node.id == end_node.id:
-                    stack = []
-                    break
-
-                for adj_node in self.get_adjacent_nodes(cur_node):
-                    if adj_node.id in visited_nodes:
-                        continue
-                    stack.append(adj_node)
+            cur_node = stack.pop()
+            pops += 1
+            if cur_node.id in visit_order:
+                continue
+
+            # Edges to the already visited neighbours in the order they were
+            # visited, the last one is the parent in the path
+            adjacency = self._adjacency.get(cur_node.id, {})
+            visited_adj_ids = sorted(
+                (adj_id for adj_id in adjacency if adj_id in visit_order),
+                key=visit_order.__getitem__,
+            )
+            for visited_node_id in visited_adj_ids:
+                edge = adjacency[visited_node_id]
+                visited_edges.append([visited_node_id, cur_node.id, edge])
+                path[cur_node.id] = visited_node_id
 
-        print("Visited nodes: ", [str(node_id) for node_id in visited_nodes])
+            visit_order[cur_node.id] = len(visited_nodes)
+            visited_nodes.append(cur_node.id)
+            if cur_node.id == end_node.id:
+                break
 
-        return {
-            "final_path": self.build_path(path, start_node, end_node),
-            "visited_nodes": visited_nodes,
-            "visited_edges": visited_edges,
-        }
+            for adj_node_id, edge in adjacency.items():
+                relaxed += 1
+                if adj_node_id in visit_order:
+                    continue
+                stack.append(edge.nodeB if edge.nodeA.id == cur_node.id else edge.nodeA)
+                pushes += 1
+            if len(stack) > peak_frontier:
+                peak_frontier = len(stack)
+
+        stats.nodes_expanded = len(visited_nodes)
+        stats.edges_relaxed = relaxed
+        stats.heap_pushes = pushes
+        stats.heap_pops = pops
+        stats.peak_frontier = peak_frontier
+        return self._finish_search(
+            stats, path, start_node, end_node, visited_nodes, visited_edges
+        )
 
     def build_path(self, path, start_node, end_node):
         current_node = end_node
@@ -342,7 +1093,11 @@ class Graph(GraphInterface):
         current_node_id = current_node.id
         start_node_id = start_node.id
 
-        while current_node_id and current_node_id != start_node_id:
+        if current_node_id != start_node_id and current_node_id not in path:
+            # The end node was never reached
+            return None
+
+        while current_node_id is not None and current_node_id != start_node_id:
             path_list.append(current_node_id)
             current_node_id = path[current_node_id]
         path_list.append(start_node_id)
@@ -371,33 +1126,135 @@ class Graph(GraphInterface):
     # ----------
 
     def save_to_files(self, nodelist_path, edgelist_path):
-        # Save the list of nodes to a csv file
+        # Save the nodes and edges to csv files, compressed when a path ends
+        # with .gz or .zst
+        # Each file is only replaced once it was written completely
         print(f"Saving graph to {nodelist_path} and {edgelist_path}")
 
         try:
-            with open(nodelist_path, "w") as file:
-                for i, node in enumerate(self.nodes):
-                    # id,x,y
-                    line = f"{node.id},{node.pos[0]},{node.pos[1]}"
-                    if i != len(self.nodes) - 1:
-                        line += "\n"
-
-                    file.write(line)
-
-            with open(edgelist_path, "w") as file:
-                for i, edge in enumerate(self.edges):
-                    # id,nodeA_id,nodeB_id,weight
-                    line = f"{edge.id},{edge.nodeA.id},{edge.nodeB.id},{edge.weight}"
-                    if i != len(self.edges) - 1:
-                        line += "\n"
-
-                    file.write(line)
-            return True
+            write_csv(nodelist_path, self.nodes, format_node)
+            write_csv(edgelist_path, self.edges, format_edge)
         except Exception as e:
-            return False
+            print(f"Save Graph Error: {e}")
+            raise
+        return True
+
+    def save_incremental(self, nodelist_path, edgelist_path, journal_path):
+        # Append the changes since the last save to the journal
+        # Saves a new csv snapshot instead when the graph did not come from
+        # these files or when the journal got long compared to the graph
+        # Returns True when a snapshot was saved
+        paths = (nodelist_path, edgelist_path, journal_path)
+        if self._changes is not None and self._journal_paths == paths:
+            max_changes = max(
+                JOURNAL_MIN_CHANGES,
+                JOURNAL_COMPACT_RATIO * (len(self.nodes) + len(self.edges)),
+            )
+            journal_length = self._journal_length or 0
+            if journal_length + len(self._changes) <= max_changes:
+                print(f"Saving {len(self._changes)} changes to {journal_path}")
+                if self._journal_length is None:
+                    start_journal(journal_path, nodelist_path, edgelist_path)
+                append_changes(journal_path, self._changes)
+                self._journal_length = journal_length + len(self._changes)
+                self._changes = []
+                self._move_indexes = {}
+                return False
+
+        self.save_to_files(nodelist_path, edgelist_path)
+        start_journal(journal_path, nodelist_path, edgelist_path)
+        self._journal_paths = paths
+        self._journal_length = 0
+        self._changes = []
+        self._move_indexes = {}
+        return True
+
+    def load_incremental(
+        self,
+        nodelist_path,
+        edgelist_path,
+        journal_path,
+        node_factory=Node,
+        edge_factory=Edge,
+        progress=None,
+        workers=None,
+    ):
+        # Load a snapshot saved by save_incremental and replay its journal
+        if not os.path.exists(nodelist_path) or not os.path.exists(edgelist_path):
+            print(
+                f"Load Graph Error: No {nodelist_path} and {edgelist_path} files found"
+            )
+            return
 
-    def load_from_files(self, nodelist_path, edgelist_path):
+        self.load_from_files(
+            nodelist_path, edgelist_path, node_factory, edge_factory, progress, workers
+        )
+        self.replay_journal(
+            nodelist_path, edgelist_path, journal_path, node_factory, edge_factory
+        )
+
+    def replay_journal(
+        self,
+        nodelist_path,
+        edgelist_path,
+        journal_path,
+        node_factory=Node,
+        edge_factory=Edge,
+    ):
+        # Apply the journal of the snapshot that was just loaded, in any
+        # format, and let save_incremental append to it afterwards
+        changes = read_journal(journal_path, nodelist_path, edgelist_path)
+        if changes:
+            print(f"Replaying {len(changes)} changes from {journal_path}")
+            # Replayed nodes and edges must not move the id counters back
+            next_node_id = Node._id
+            next_edge_id = Edge._id
+            with self.batch():
+                for change in changes:
+                    self._apply_change(change, node_factory, edge_factory)
+                    if change[0] == "add_node":
+                        next_node_id = max(next_node_id, change[1] + 1)
+                    elif change[0] == "add_edge":
+                        next_edge_id = max(next_edge_id, change[1] + 1)
+            Node._id = next_node_id
+            Edge._id = next_edge_id
+
+        self._journal_paths = (nodelist_path, edgelist_path, journal_path)
+        self._journal_length = None if changes is None else len(changes)
+        self._changes = []
+        self._move_indexes = {}
+
+    def _apply_change(self, change, node_factory, edge_factory):
+        action = change[0]
+        if action == "add_node":
+            self.add_node(node_factory(change[1], change[2], change[3]))
+        elif action == "add_edge":
+            nodeA = self.get_node_by_id(change[2])
+            nodeB = self.get_node_by_id(change[3])
+            self.add_edge(edge_factory(change[1], nodeA, nodeB, change[4]))
+        elif action == "delete_node":
+            self.delete_node(change[1])
+        elif action == "delete_edge":
+            self.delete_edge(change[1])
+        elif action == "update_edge_weight":
+            self.update_edge_weight(change[1], change[2])
+        elif action == "move_node":
+            self.update_node_position(change[1], change[2], change[3])
+
+    def load_from_files(
+        self,
+        nodelist_path,
+        edgelist_path,
+        node_factory=Node,
+        edge_factory=Edge,
+        progress=None,
+        workers=None,
+    ):
         # Load nodes and edges from nodelist_path and edgelist_path
+        # node_factory(id, x, y) and edge_factory(id, nodeA, nodeB, weight)
+        # create the elements, progress(stage, bytes_done, bytes_total) is
+        # called while reading
+        # With workers > 1 the files are parsed by a pool of worker processes
         if not os.path.exists(nodelist_path) or not os.path.exists(edgelist_path):
             print(
                 f"Load Graph Error: No {nodelist_path} and {edgelist_path} files found"
@@ -405,26 +1262,187 @@ class Graph(GraphInterface):
             return
         print(f"Loading graph from {nodelist_path} and {edgelist_path}")
 
-        self.nodes = []
-        self.edges = []
-        with open(nodelist_path, "r") as file:
-            for line in file:
-                # id,x,y
-                line = line.strip().split(",")
-                node = Node(int(line[0]), float(line[1]), float(line[2]))
-                self.add_node(node)
+        self._load_chunks(
+            iter_node_chunks(nodelist_path, progress, workers),
+            iter_edge_chunks(edgelist_path, progress, workers),
+            node_factory,
+            edge_factory,
+        )
 
-        with open(edgelist_path, "r") as file:
-            for line in file:
-                # id,nodeA_id,nodeB_id,weight?
-                line = line.strip().split(",")
-                nodeA = self.get_node_by_id(int(line[1]))
-                nodeB = self.get_node_by_id(int(line[2]))
-                weight = 1.0
-                if len(line) >= 4:
-                    weight = float(line[3])
-                edge = Edge(int(line[0]), nodeA, nodeB, weight)
-                self.add_edge(edge)
+    def save_binary(self, path):
+        # Save the graph in the binary column format, see binary_io.py
+        print(f"Saving graph to {path}")
+        save_binary(path, self.nodes, self.edges)
+        return True
+
+    def load_binary(self, path, node_factory=Node, edge_factory=Edge):
+        # Load a graph saved by save_binary through a memory mapping
+        if not is_binary_graph_file(path):
+            print(f"Load Graph Error: {path} is not a binary graph file")
+            return
+        print(f"Loading graph from {path}")
+
+        with BinaryGraphFile(path) as binary_file:
+            self._load_chunks(
+                binary_file.iter_node_chunks(),
+                binary_file.iter_edge_chunks(),
+                node_factory,
+                edge_factory,
+            )
+
+    def load_mapped(self, path, node_factory=Node, edge_factory=Edge):
+        # Open a graph saved by save_binary without loading it
+        # Nodes and edges are created from the file when they are first used
+        # Meant for headless queries, iterating self.nodes or self.edges creates
+        # every element, so the GUI which draws them all uses load_binary
+        if not is_binary_graph_file(path):
+            print(f"Load Graph Error: {path} is not a binary graph file")
+            return
+        print(f"Opening graph {path}")
+
+        store = MappedStore(path, node_factory, edge_factory)
+        self._set_contents(
+            store.nodes,
+            store.edges,
+            store.node_map,
+            store.edge_map,
+            store.adjacency,
+            mapped_store=store,
+        )
+        Node._id = store.get_next_node_id()
+        Edge._id = store.get_next_edge_id()
+
+    def get_loaded_counts(self):
+        # (nodes, edges) that exist as python objects
+        if self._mapped_store is not None:
+            return self._mapped_store.get_loaded_counts()
+        return len(self.nodes), len(self.edges)
+
+    def get_nodes_in_rect(self, x0, y0, x1, y1):
+        # Nodes with x0 <= x <= x1 and y0 <= y <= y1
+        if self._mapped_store is not None:
+            node_ids = self._mapped_store.get_node_ids_in_rect(x0, y0, x1, y1)
+            return [self._node_map[node_id] for node_id in node_ids]
+
+        return [
+            node
+            for node in self.nodes
+            if x0 <= node.pos[0] <= x1 and y0 <= node.pos[1] <= y1
+        ]
+
+    def load_dimacs(self, gr_path, co_path=None, node_factory=Node, edge_factory=Edge):
+        # Load a DIMACS .gr file and optionally its .co coordinates
+        # The two arcs of an edge become one edge
+        print(f"Importing DIMACS graph from {gr_path}")
+        self._load_chunks(
+            formats.iter_dimacs_node_chunks(gr_path, co_path),
+            formats.iter_dimacs_edge_chunks(gr_path),
+            node_factory,
+            edge_factory,
+            merge_parallel=True,
+        )
+
+    def save_dimacs(self, gr_path, co_path=None):
+        # Nodes are numbered from 1 in the order of self.nodes
+        print(f"Exporting DIMACS graph to {gr_path}")
+        formats.write_dimacs(gr_path, co_path, self.nodes, self.edges)
+        return True
+
+    def load_metis(self, path, node_factory=Node, edge_factory=Edge):
+        # Nodes have no position in METIS files and are placed on a grid
+        print(f"Importing METIS graph from {path}")
+        self._load_chunks(
+            formats.iter_metis_node_chunks(path),
+            formats.iter_metis_edge_chunks(path),
+            node_factory,
+            edge_factory,
+            merge_parallel=True,
+        )
+
+    def save_metis(self, path):
+        # Nodes are numbered from 1 in the order of self.nodes
+        print(f"Exporting METIS graph to {path}")
+        formats.write_metis(path, self.nodes, self._adjacency)
+        return True
+
+    def load_edge_list(self, path, node_factory=Node, edge_factory=Edge):
+        # Load a SNAP style edge list, nodes are placed on a grid
+        print(f"Importing edge list from {path}")
+        self._load_chunks(
+            formats.iter_edge_list_node_chunks(path),
+            formats.iter_edge_list_edge_chunks(path),
+            node_factory,
+            edge_factory,
+            merge_parallel=True,
+        )
+
+    def save_edge_list(self, path):
+        print(f"Exporting edge list to {path}")
+        formats.write_edge_list(path, self.nodes, self.edges)
+        return True
+
+    def load_generated(
+        self, kind, node_count, seed=0, node_factory=Node, edge_factory=Edge, **options
+    ):
+        # Replace the graph with a generated one, see generators.GENERATORS
+        print(f"Generating {kind} graph with {node_count} nodes")
+        columns = generators.generate(kind, node_count, seed, **options)
+        self._load_chunks(
+            generators.iter_node_chunks(columns),
+            generators.iter_edge_chunks(columns),
+            node_factory,
+            edge_factory,
+        )
+
+    def _load_chunks(
+        self,
+        node_chunks,
+        edge_chunks,
+        node_factory,
+        edge_factory,
+        merge_parallel=False,
+    ):
+        # Replace the graph with the rows from node_chunks and edge_chunks
+        # With merge_parallel an edge between two already connected nodes is
+        # merged into the first one, which keeps the smaller of the weights
+        with pause_gc():
+            nodes = []
+            node_map = {}
+            for rows in node_chunks:
+                for node_id, x, y in rows:
+                    node = node_factory(node_id, x, y)
+                    nodes.append(node)
+                    node_map[node_id] = node
+
+            # Build the edge indexes while reading instead of in rebuild_indexes
+            edges = []
+            edge_map = {}
+            adjacency = {node_id: {} for node_id in node_map}
+            for rows in edge_chunks:
+                for edge_id, nodeA_id, nodeB_id, weight in rows:
+                    nodeA = node_map.get(nodeA_id)
+                    nodeB = node_map.get(nodeB_id)
+                    if nodeA is None or nodeB is None:
+                        print(f"Load Graph Error: Edge {edge_id} has a missing node")
+                        continue
+                    if merge_parallel and nodeB_id in adjacency[nodeA_id]:
+                        first_edge = adjacency[nodeA_id][nodeB_id]
+                        if weight < first_edge.weight:
+                            first_edge.weight = weight
+                        continue
+                    edge = edge_factory(edge_id, nodeA, nodeB, weight)
+                    edges.append(edge)
+                    edge_map[edge_id] = edge
+                    adjacency[nodeA_id].setdefault(nodeB_id, edge)
+                    adjacency[nodeB_id].setdefault(nodeA_id, edge)
+
+        self._set_contents(nodes, edges, node_map, edge_map, adjacency)
+
+        # New nodes and edges get ids after the largest loaded ones
+        if nodes:
+            Node._id = max(node_map) + 1
+        if edges:
+            Edge._id = max(edge_map) + 1
 
     def resolve_node(self, node_or_id):
         node = None
@@ -432,7 +1450,7 @@ class Graph(GraphInterface):
             node = self.get_node_by_id(node_or_id)
         if isinstance(node_or_id, float):
             node = self.get_node_by_id(int(node_or_id))
-        elif isinstance(node_or_id, Node):
+        elif isinstance(node_or_id, (Node, NodeView)):
             node = node_or_id
 
         return node
@@ -441,7 +1459,7 @@ class Graph(GraphInterface):
         edge = None
         if isinstance(edge_or_id, int):
             edge = self.get_edge_by_id(edge_or_id)
-        elif isinstance(edge_or_id, Edge):
+        elif isinstance(edge_or_id, (Edge, EdgeView)):
             edge = edge_or_id
 
         return edge
@@ -0,0 +1,54 @@
+"""
+File: heuristics.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+# Registry of A* heuristics
+# Each entry is a factory(graph, end_node) that returns a function h(node)
+# estimating the cost from node to end_node
+HEURISTICS = {}
+
+
+def register_heuristic(name, factory):
+    HEURISTICS[name] = factory
+
+
+def resolve_heuristic(graph, heu_func, end_node):
+    # heu_func can be a registered name or a callable(nodeA, nodeB)
+    if callable(heu_func):
+        return lambda node: heu_func(node, end_node)
+
+    factory = HEURISTICS.get(heu_func)
+    if factory is None:
+        print("Invalid heuristic function in A*")
+        raise Exception("Invalid heuristic function in A*")
+    return factory(graph, end_node)
+
+
+def euclidean_heuristic(graph, end_node):
+    return lambda node: graph.get_euclidean_distance(node, end_node)
+
+
+def manhattan_heuristic(graph, end_node):
+    return lambda node: graph.get_manhattan_distance(node, end_node)
+
+
+def scaled_euclidean_heuristic(graph, end_node):
+    # Scale the straight line distance by the smallest weight / length ratio
+    # of any edge so the estimate never exceeds the real cost, even when the
+    # edge weights are not the edge lengths
+    ratio = graph.get_min_weight_ratio()
+    return lambda node: ratio * graph.get_euclidean_distance(node, end_node)
+
+
+def zero_heuristic(graph, end_node):
+    # Turns A* into Dijkstra
+    return lambda node: 0
+
+
+register_heuristic("euclidean", euclidean_heuristic)
+register_heuristic("manhattan", manhattan_heuristic)
+register_heuristic("scaled_euclidean", scaled_euclidean_heuristic)
+register_heuristic("zero", zero_heuristic)
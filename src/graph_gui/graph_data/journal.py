@@ -0,0 +1,113 @@
+"""
+File: journal.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import os
+from .csv_io import atomic_write
+
+# A journal is a text file of changes made after a csv snapshot was saved
+# The first line names the snapshot it belongs to:
+#   snapshot,nodelist mtime_ns,nodelist size,edgelist mtime_ns,edgelist size
+# Every other line is one change:
+#   add_node,id,x,y
+#   add_edge,id,nodeA_id,nodeB_id,weight
+#   delete_node,id
+#   delete_edge,id
+#   update_edge_weight,id,weight
+#   move_node,id,x,y
+
+# Types of the values of every change
+CHANGE_TYPES = {
+    "add_node": (int, float, float),
+    "add_edge": (int, int, int, float),
+    "delete_node": (int,),
+    "delete_edge": (int,),
+    "update_edge_weight": (int, float),
+    "move_node": (int, float, float),
+}
+
+
+def get_snapshot_id(nodelist_path, edgelist_path):
+    values = []
+    for path in (nodelist_path, edgelist_path):
+        stat = os.stat(path)
+        values += [stat.st_mtime_ns, stat.st_size]
+    return values
+
+
+def format_change(change):
+    return ",".join(str(value) for value in change)
+
+
+def start_journal(journal_path, nodelist_path, edgelist_path):
+    # Replace the journal with an empty one for the snapshot
+    snapshot_id = get_snapshot_id(nodelist_path, edgelist_path)
+    with atomic_write(journal_path) as file:
+        file.write((format_change(["snapshot"] + snapshot_id) + "\n").encode())
+
+
+def append_changes(journal_path, changes):
+    # Every change ends with a newline, so a change cut off by a crash can be
+    # told apart when reading
+    text = "".join(format_change(change) + "\n" for change in changes)
+    with open(journal_path, "r+b") as file:
+        _drop_partial_line(file)
+        file.seek(0, os.SEEK_END)
+        file.write(text.encode())
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _drop_partial_line(file):
+    # Remove a change that was cut off by a crash while appending
+    end = file.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    file.seek(end - 1)
+    if file.read(1) == b"\n":
+        return
+
+    while end > 0:
+        start = max(0, end - 4096)
+        file.seek(start)
+        block = file.read(end - start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            file.truncate(start + newline + 1)
+            return
+        end = start
+    file.truncate(0)
+
+
+def read_journal(journal_path, nodelist_path, edgelist_path):
+    # List of changes, or None when there is no journal for the snapshot
+    if not os.path.exists(journal_path):
+        return None
+
+    with open(journal_path, "rb") as file:
+        lines = file.read().decode().split("\n")
+    # The last part is empty unless the last change was cut off
+    lines.pop()
+
+    if not lines:
+        return None
+    header = lines[0].split(",")
+    snapshot_id = get_snapshot_id(nodelist_path, edgelist_path)
+    if header[0] != "snapshot" or [int(value) for value in header[1:]] != snapshot_id:
+        print(f"Journal {journal_path} belongs to another snapshot, ignoring it")
+        return None
+
+    changes = []
+    for line in lines[1:]:
+        values = line.split(",")
+        types = CHANGE_TYPES.get(values[0])
+        if types is None or len(values) != len(types) + 1:
+            print(f"Invalid journal line: {line}")
+            raise Exception("Invalid journal line")
+        changes.append(
+            [values[0]] + [value_type(v) for value_type, v in zip(types, values[1:])]
+        )
+    return changes
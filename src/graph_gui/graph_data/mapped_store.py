@@ -0,0 +1,296 @@
+"""
+File: mapped_store.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+import abc
+from collections.abc import MutableMapping
+from itertools import islice
+
+from .node import Node
+from .edge import Edge
+from .binary_io import BinaryGraphFile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MappedStore:
+    # Graph contents backed by a memory mapped binary graph file
+    # Node and Edge objects are only created when they are first looked up and
+    # are kept afterwards, so memory grows with the part of the graph in use
+    # Changes are kept in memory, the file is never written
+    # Installed into a Graph by Graph.load_mapped
+
+    def __init__(self, path, node_factory=Node, edge_factory=Edge):
+        self.file = BinaryGraphFile(path)
+        if not self.file.has_index:
+            self.file.close()
+            print(f"Load Graph Error: {path} has no index, save it again")
+            raise Exception("Binary graph file has no index")
+
+        self.node_map = LazyNodeMap(self, node_factory)
+        self.edge_map = LazyEdgeMap(self, edge_factory)
+        self.adjacency = LazyAdjacency(self)
+        self.nodes = ElementList(self.node_map, self.file.node_ids)
+        self.edges = ElementList(self.edge_map, self.file.edge_ids)
+
+    def get_next_node_id(self):
+        if self.file.node_count == 0:
+            return 0
+        return self.file.node_ids[self.file.node_order[-1]] + 1
+
+    def get_next_edge_id(self):
+        if self.file.edge_count == 0:
+            return 0
+        return self.file.edge_ids[self.file.edge_order[-1]] + 1
+
+    def get_loaded_counts(self):
+        # (nodes, edges) that currently exist as python objects
+        return len(self.node_map.loaded), len(self.edge_map.loaded)
+
+    def get_node_ids_in_rect(self, x0, y0, x1, y1):
+        node_map = self.node_map
+        node_ids = []
+
+        # Rows in the file, loaded nodes are checked below as they may have moved
+        if np is not None:
+            xs = np.frombuffer(self.file.node_x, dtype=np.float64)
+            ys = np.frombuffer(self.file.node_y, dtype=np.float64)
+            rows = np.nonzero((xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1))[0]
+            del xs, ys
+            rows = rows.tolist()
+        else:
+            xs = self.file.node_x
+            ys = self.file.node_y
+            rows = [
+                row
+                for row in range(self.file.node_count)
+                if x0 <= xs[row] <= x1 and y0 <= ys[row] <= y1
+            ]
+        for row in rows:
+            node_id = self.file.node_ids[row]
+            if node_id not in node_map.loaded and node_id not in node_map.deleted:
+                node_ids.append(node_id)
+
+        for node_id, node in node_map.loaded.items():
+            if x0 <= node.pos[0] <= x1 and y0 <= node.pos[1] <= y1:
+                node_ids.append(node_id)
+        return node_ids
+
+    def close(self):
+        self.file.close()
+
+
+class LazyElementMap(MutableMapping):
+    # id -> element map over the rows of the file plus the in memory changes
+    # MutableMapping uses abc.ABCMeta, so a subclass can only be created once
+    # it defines the abstract methods below
+
+    def __init__(self, store, factory):
+        self.store = store
+        self.factory = factory
+        self.loaded = {}  # id -> element created from the file or added
+        self.added = set()  # ids that are not in the file
+        self.deleted = set()  # ids in the file that were deleted
+
+    @abc.abstractmethod
+    def _find_row(self, element_id):
+        pass
+
+    @abc.abstractmethod
+    def _create(self, row):
+        pass
+
+    @abc.abstractmethod
+    def _get_file_ids(self):
+        pass
+
+    def __getitem__(self, element_id):
+        element = self.loaded.get(element_id)
+        if element is not None:
+            return element
+        if element_id in self.deleted or not isinstance(element_id, int):
+            raise KeyError(element_id)
+
+        row = self._find_row(element_id)
+        if row is None:
+            raise KeyError(element_id)
+        element = self._create(row)
+        self.loaded[element_id] = element
+        return element
+
+    def __setitem__(self, element_id, element):
+        self.loaded[element_id] = element
+        if element_id in self.deleted:
+            self.deleted.discard(element_id)
+        elif self._find_row(element_id) is None:
+            self.added.add(element_id)
+
+    def __delitem__(self, element_id):
+        if element_id not in self:
+            raise KeyError(element_id)
+        self.loaded.pop(element_id, None)
+        if element_id in self.added:
+            self.added.discard(element_id)
+        else:
+            self.deleted.add(element_id)
+
+    def __contains__(self, element_id):
+        if element_id in self.loaded:
+            return True
+        if element_id in self.deleted or not isinstance(element_id, int):
+            return False
+        return self._find_row(element_id) is not None
+
+    def __iter__(self):
+        # File order first, then the added ids in the order they were added
+        deleted = self.deleted
+        for element_id in self._get_file_ids():
+            if element_id not in deleted:
+                yield element_id
+        for element_id in list(self.loaded):
+            if element_id in self.added:
+                yield element_id
+
+    def __len__(self):
+        return len(self._get_file_ids()) - len(self.deleted) + len(self.added)
+
+
+class LazyNodeMap(LazyElementMap):
+    def _find_row(self, node_id):
+        return self.store.file.find_node_row(node_id)
+
+    def _get_file_ids(self):
+        return self.store.file.node_ids
+
+    def _create(self, row):
+        file = self.store.file
+        # Node() moves the id counter, keep it where the graph set it
+        next_id = Node._id
+        node = self.factory(file.node_ids[row], file.node_x[row], file.node_y[row])
+        Node._id = next_id
+        return node
+
+
+class LazyEdgeMap(LazyElementMap):
+    def _find_row(self, edge_id):
+        return self.store.file.find_edge_row(edge_id)
+
+    def _get_file_ids(self):
+        return self.store.file.edge_ids
+
+    def _create(self, row):
+        file = self.store.file
+        node_map = self.store.node_map
+        nodeA = node_map[file.edge_a[row]]
+        nodeB = node_map[file.edge_b[row]]
+        next_id = Edge._id
+        edge = self.factory(file.edge_ids[row], nodeA, nodeB, file.edge_weights[row])
+        Edge._id = next_id
+        return edge
+
+
+class LazyAdjacency(MutableMapping):
+    # node id -> {neighbour node id -> edge}
+    # The dict of a node is built from the file the first time it is needed
+    # and from then on is updated by the graph like any other adjacency dict
+
+    def __init__(self, store):
+        self.store = store
+        self.loaded = {}
+
+    def __getitem__(self, node_id):
+        neighbours = self.loaded.get(node_id)
+        if neighbours is not None:
+            return neighbours
+        if node_id not in self.store.node_map:
+            raise KeyError(node_id)
+
+        neighbours = {}
+        file = self.store.file
+        row = None
+        if node_id not in self.store.node_map.added:
+            row = file.find_node_row(node_id)
+        if row is not None:
+            edge_map = self.store.edge_map
+            for p in range(file.adj_indptr[row], file.adj_indptr[row + 1]):
+                edge = edge_map.get(file.edge_ids[file.adj_edges[p]])
+                if edge is None:
+                    # Deleted
+                    continue
+                if edge.nodeA.id == node_id:
+                    neighbours.setdefault(edge.nodeB.id, edge)
+                elif edge.nodeB.id == node_id:
+                    neighbours.setdefault(edge.nodeA.id, edge)
+                # Else the edge id was deleted and reused for another edge
+
+        self.loaded[node_id] = neighbours
+        return neighbours
+
+    def reload(self, node_id):
+        # Builds the dict of a node again from the file, then adds the loaded
+        # edges that are not in the file rows of the node
+        self.loaded.pop(node_id, None)
+        if node_id not in self.store.node_map:
+            return
+        neighbours = self[node_id]
+        for edge in self.store.edge_map.loaded.values():
+            if edge.nodeA.id == node_id:
+                neighbours.setdefault(edge.nodeB.id, edge)
+            elif edge.nodeB.id == node_id:
+                neighbours.setdefault(edge.nodeA.id, edge)
+
+    def __setitem__(self, node_id, neighbours):
+        self.loaded[node_id] = neighbours
+
+    def __delitem__(self, node_id):
+        self[node_id]
+        del self.loaded[node_id]
+
+    def __contains__(self, node_id):
+        return node_id in self.store.node_map
+
+    def __iter__(self):
+        return iter(self.store.node_map)
+
+    def __len__(self):
+        return len(self.store.node_map)
+
+
+class ElementList:
+    # Read only list view of the elements of a lazy map, used as graph.nodes
+    # and graph.edges
+    # Iterating it creates every element, prefer the id based lookups
+
+    def __init__(self, element_map, file_ids):
+        self.element_map = element_map
+        self.file_ids = file_ids
+
+    def append(self, element):
+        self.element_map[element.id] = element
+
+    def __len__(self):
+        return len(self.element_map)
+
+    def __iter__(self):
+        element_map = self.element_map
+        for element_id in element_map:
+            yield element_map[element_id]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("list index out of range")
+
+        if not self.element_map.deleted and index < len(self.file_ids):
+            # No rows are missing so the index is the file row
+            return self.element_map[self.file_ids[index]]
+        return next(islice(iter(self), index, None))
@@ -5,8 +5,12 @@ Repo: https://github.com/3ddelano/graph-visualizer-python
 License: MIT
 """
 
+from array import array
+
 
 class Node:
+    __slots__ = ("id", "pos")
+
     _id = 0
 
     def __init__(self, *args):
@@ -16,9 +20,9 @@ class Node:
             self.id = Node._id
             Node._id += 1
 
-            self.pos = [args[0], args[1]]
+            self.pos = array("d", (args[0], args[1]))
         else:
             # args = [id, x, y]
             self.id = args[0]
-            self.pos = [args[1], args[2]]
+            self.pos = array("d", (args[1], args[2]))
             Node._id = self.id + 1  # For the next node
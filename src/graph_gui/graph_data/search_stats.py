@@ -0,0 +1,72 @@
+"""
+File: search_stats.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+from time import perf_counter
+
+
+class SearchStats:
+    # Counters and timings of one path search, returned as result["stats"]
+    # The algorithms count in local variables and store the totals at the
+    # end, so the counters cost almost nothing inside the search loops
+    __slots__ = (
+        "algorithm",
+        "nodes_expanded",
+        "edges_relaxed",
+        "heap_pushes",
+        "heap_pops",
+        "peak_frontier",
+        "wall_time",
+        "phases",
+        "_start_time",
+        "_phase_start_time",
+    )
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.nodes_expanded = 0
+        self.edges_relaxed = 0
+        # Pushes and pops of the heap, or of the queue / stack of bfs and dfs
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.peak_frontier = 0
+        self.wall_time = 0.0
+        # Phase name -> seconds, in the order the phases ended
+        self.phases = {}
+        self._start_time = perf_counter()
+        self._phase_start_time = self._start_time
+
+    def end_phase(self, name):
+        # Adds the time since the previous phase ended to the phase name
+        now = perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._phase_start_time
+        self._phase_start_time = now
+        self.wall_time = now - self._start_time
+
+    def to_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "nodes_expanded": self.nodes_expanded,
+            "edges_relaxed": self.edges_relaxed,
+            "heap_pushes": self.heap_pushes,
+            "heap_pops": self.heap_pops,
+            "peak_frontier": self.peak_frontier,
+            "wall_time": self.wall_time,
+            "phases": dict(self.phases),
+        }
+
+    def __str__(self):
+        lines = [
+            f"Algorithm: {self.algorithm}",
+            f"Nodes expanded: {self.nodes_expanded}",
+            f"Edges relaxed: {self.edges_relaxed}",
+            f"Heap pushes / pops: {self.heap_pushes} / {self.heap_pops}",
+            f"Peak frontier size: {self.peak_frontier}",
+            f"Wall time: {self.wall_time * 1000:.3f} ms",
+        ]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name}: {seconds * 1000:.3f} ms")
+        return "\n".join(lines)
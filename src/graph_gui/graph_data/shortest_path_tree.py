@@ -0,0 +1,28 @@
+"""
+File: shortest_path_tree.py
+Author: Delano Lourenco
+Repo: https://github.com/3ddelano/graph-visualizer-python
+License: MIT
+"""
+
+
+class ShortestPathTree:
+    def __init__(self, graph, source_node, dist, path):
+        self.graph = graph
+        self.source_node = source_node
+        self.dist = dist  # node id -> distance from the source node
+        self.path = path  # node id -> previous node id towards the source node
+
+    def distance_to(self, node_or_id):
+        node = self.graph.resolve_node(node_or_id)
+        if not node:
+            return None
+        return self.dist.get(node.id)
+
+    def path_to(self, node_or_id):
+        # Same format as Graph.find_shortest_path
+        node = self.graph.resolve_node(node_or_id)
+        if not node or node.id not in self.dist:
+            # Not reached by the search, or it stopped before the node
+            return None
+        return self.graph.build_path(self.path, self.source_node, node)
@@ -5,13 +5,13 @@ Repo: https://github.com/3ddelano/graph-visualizer-python
 License: MIT
 """
 
-
 import os
 from time import time, sleep
 import tkinter.filedialog as filedialog
 import tkinter as tk
 
 from .graph_data.graph import Graph
+from .graph_data.binary_io import is_binary_graph_file
 from .constants import START_NODE_COLOR, END_NODE_COLOR, SCREEN_BG_COLOR
 from .animations.path_animation import PathAnimation
 from .animations.bfs_animation import BFSAnimation
@@ -19,18 +19,22 @@ from .animations.dfs_animation import DFSAnimation
 from .interfaces.drawable import Drawable
 from .edgegui import EdgeGUI
 from .nodegui import NodeGUI
+from .frame_profiler import FrameProfiler
 
 VERSION = "v.1.2"
 
 DOUBLE_CLICK_TIME = 0.3
 NODELIST_FILEPATH = "nodelist.csv"
 EDGELIST_FILEPATH = "edgelist.csv"
+BINARY_FILEPATH = "graph.bin"
+JOURNAL_FILEPATH = "journal.csv"
+TRACE_FILEPATH = "frame_trace.csv"
 
 ANIMATION_FRAME_DURATION = 9
 
 
 class GraphGUI(Graph, Drawable):
-    def __init__(self, canvas):
+    def __init__(self, canvas, master=None):
         # Selected node
         self.selected_node = None
         self.dragging_node = None
@@ -49,9 +53,12 @@ class GraphGUI(Graph, Drawable):
         self.frames = 0
         self.help_visible = False
         self.node_id_visible = False
+        # Times the phases of every frame, see main.one_step
+        self.profiler = FrameProfiler()
 
         # Path finding UI
-        self.path_algorithm_name = tk.StringVar(value="dijkstra")
+        # The Tk variables belong to master, or to the default root when None
+        self.path_algorithm_name = tk.StringVar(master=master, value="dijkstra")
         self.start_node = None
         self.goal_node = None
         self.path = []
@@ -259,31 +266,28 @@ class GraphGUI(Graph, Drawable):
     def ondrag(self, x, y):
         if self.dragging_node:
             # Node is being dragged
-            self.dragging_node.pos[0] = x
-            self.dragging_node.pos[1] = y
+            self.update_node_position(self.dragging_node, x, y)
         elif self.dragging_edge:
             # Edge is being dragged
             nodeA = self.dragging_edge.nodeA
             nodeB = self.dragging_edge.nodeB
             offsets = self.dragging_edge_offsets
 
-            nodeA.pos[0] = offsets[0] + x - offsets[4]
-            nodeA.pos[1] = offsets[1] + y - offsets[5]
-            nodeB.pos[0] = offsets[2] + x - offsets[4]
-            nodeB.pos[1] = offsets[3] + y - offsets[5]
+            self.update_node_position(
+                nodeA, offsets[0] + x - offsets[4], offsets[1] + y - offsets[5]
+            )
+            self.update_node_position(
+                nodeB, offsets[2] + x - offsets[4], offsets[3] + y - offsets[5]
+            )
 
     def on_delete(self):
         if self.selected_node:
             # Delete the node
             node = self.selected_node
             node.is_selected = False
+            # Also deletes the connected edges
             self.delete_node(node)
 
-            # Delete connected edges
-            connected_edges = self.get_adjacent_edges(node)
-            for edge in connected_edges:
-                self.delete_edge(edge)
-
             self.selected_node = None
         elif self.selected_edge:
             # Delete the edge
@@ -293,6 +297,10 @@ class GraphGUI(Graph, Drawable):
             self.selected_edge = None
 
     def draw(self, tur, canvas):
+        # The time since the frame started, like clearing the screen, is not
+        # part of the animation phase
+        self.profiler.end_phase("clear")
+
         # Check if animation ended
         if self.animation and self.animation.is_ended():
             self.animation = None
@@ -310,6 +318,7 @@ class GraphGUI(Graph, Drawable):
             # Get the drawn nodes and edges from animation
             animation_nodes = self.animation.get_drawn_nodes()
             animation_edges = self.animation.get_drawn_edges()
+        self.profiler.end_phase("animation")
 
         # Draw all edges
         for edge in self.edges:
@@ -323,8 +332,13 @@ class GraphGUI(Graph, Drawable):
                     break
             if not animation_drew_edge:
                 edge.draw(tur)
+        self.profiler.end_phase("edges")
 
-            edge.draw_weight(canvas)
+        # Draw the edge weights after all edges, in their own phase
+        for edge in self.edges:
+            if isinstance(edge, EdgeGUI):
+                edge.draw_weight(canvas)
+        self.profiler.end_phase("edge_labels")
 
         # Draw all nodes
         for node in self.nodes:
@@ -343,14 +357,23 @@ class GraphGUI(Graph, Drawable):
                     node.draw(tur, color=END_NODE_COLOR)
                 else:
                     node.draw(tur)
+        self.profiler.end_phase("nodes")
 
-            if self.node_id_visible:
-                node.draw_id(canvas)
+        if self.node_id_visible:
+            for node in self.nodes:
+                if isinstance(node, NodeGUI):
+                    node.draw_id(canvas)
+        self.profiler.end_phase("node_labels")
 
         self.frames += 1
 
         # Show help text
         self.draw_help(canvas)
+        self.profiler.end_phase("help")
+
+        # Show the profiler overlay
+        self.profiler.draw(canvas)
+        self.profiler.end_phase("overlay")
 
     def draw_help(self, canvas):
         main_lines = ["H key - Toggle help text"]
@@ -367,6 +390,8 @@ class GraphGUI(Graph, Drawable):
             "B key - Start BFS at selected node",
             "N key - Start DFS at selected node",
             "F key - Toggle node Id visibility",
+            "P key - Toggle frame profiler",
+            "T key - Start/Stop frame trace csv",
             "",
             "github.com/3ddelano/graph-visualizer-python",
         ]
@@ -425,6 +450,27 @@ class GraphGUI(Graph, Drawable):
     def on_nodeid_toggle(self):
         self.node_id_visible = not self.node_id_visible
 
+    def on_profiler_toggle(self):
+        self.profiler.visible = not self.profiler.visible
+
+    def on_trace_toggle(self):
+        if self.profiler.trace_file is not None:
+            print(f"Stopped frame trace {self.profiler.trace_file.name}")
+            self.profiler.stop_trace()
+            return
+        try:
+            self.profiler.start_trace(TRACE_FILEPATH)
+        except Exception as e:
+            print(f"Frame trace error: {e}")
+            tk.messagebox.showerror("Frame Trace Error", str(e))
+            return
+        print(f"Started frame trace {TRACE_FILEPATH}")
+
+    def on_ch_select(self):
+        # Queries fall back to Bi-Dijkstra until the hierarchy is built
+        if not self.has_contraction_hierarchy():
+            self.build_contraction_hierarchy()
+
     def on_update_weight(self):
         if not self.selected_edge:
             print("No edge is selected to set weight")
@@ -463,14 +509,25 @@ class GraphGUI(Graph, Drawable):
         if save_folder == "":
             # User cancelled the save
             return
-        success = self.save_to_files(
-            os.path.join(save_folder, NODELIST_FILEPATH),
-            os.path.join(save_folder, EDGELIST_FILEPATH),
-        )
-        if success:
-            tk.messagebox.showinfo(
-                "Saving Graph", "Graph saved to nodelist.csv and edgelist.csv"
+        try:
+            # Only the changes are appended to the journal when possible
+            saved_snapshot = self.save_incremental(
+                os.path.join(save_folder, NODELIST_FILEPATH),
+                os.path.join(save_folder, EDGELIST_FILEPATH),
+                os.path.join(save_folder, JOURNAL_FILEPATH),
             )
+            if saved_snapshot:
+                # Binary copy that loads much faster than the csv files
+                self.save_binary(os.path.join(save_folder, BINARY_FILEPATH))
+        except Exception as e:
+            tk.messagebox.showerror("Saving Graph Error", str(e))
+            return
+
+        if saved_snapshot:
+            message = "Graph saved to nodelist.csv, edgelist.csv and graph.bin"
+        else:
+            message = "Changes saved to journal.csv"
+        tk.messagebox.showinfo("Saving Graph", message)
 
     def on_load(self):
         load_folder = filedialog.askdirectory(mustexist=True)
@@ -480,6 +537,22 @@ class GraphGUI(Graph, Drawable):
 
         node_path = os.path.join(load_folder, NODELIST_FILEPATH)
         edge_path = os.path.join(load_folder, EDGELIST_FILEPATH)
+        binary_path = os.path.join(load_folder, BINARY_FILEPATH)
+        journal_path = os.path.join(load_folder, JOURNAL_FILEPATH)
+
+        if self.is_binary_file_current(binary_path, node_path, edge_path):
+            self.deselect_nodes()
+            self.deselect_edges()
+            self.deselect_path()
+            self.load_binary(binary_path, node_factory=NodeGUI, edge_factory=EdgeGUI)
+            self.replay_journal(
+                node_path,
+                edge_path,
+                journal_path,
+                node_factory=NodeGUI,
+                edge_factory=EdgeGUI,
+            )
+            return
 
         if not os.path.exists(node_path):
             tk.messagebox.showerror(
@@ -495,8 +568,23 @@ class GraphGUI(Graph, Drawable):
         self.deselect_nodes()
         self.deselect_edges()
         self.deselect_path()
-        self.load_from_files(node_path, edge_path)
-        self.convert_graph_to_gui()
+        self.load_incremental(
+            node_path,
+            edge_path,
+            journal_path,
+            node_factory=NodeGUI,
+            edge_factory=EdgeGUI,
+        )
+
+    def is_binary_file_current(self, binary_path, node_path, edge_path):
+        # The binary file is only used when it is not older than the csv files
+        if not is_binary_graph_file(binary_path):
+            return False
+        binary_time = os.path.getmtime(binary_path)
+        for path in (node_path, edge_path):
+            if os.path.exists(path) and os.path.getmtime(path) > binary_time:
+                return False
+        return True
 
     def on_set_start_node(
         self,
@@ -544,7 +632,8 @@ class GraphGUI(Graph, Drawable):
             self.path_algorithm_name.get(), self.start_node, self.goal_node
         )
 
-        if len(self.path) < 2:
+        if not self.path or len(self.path) < 2:
+            self.path = []
             tk.messagebox.showerror("Find Path Error", "No path found")
             return
 
@@ -582,25 +671,27 @@ class GraphGUI(Graph, Drawable):
         edges = animate_data["visited_edges"]
 
         print(f"Starting {self.path_algorithm_name.get()} path animation")
-        tk.messagebox.showinfo(
-            "Path Finding Statistics",
-            f"Number of nodes visited: {len(animate_data['visited_nodes'])}",
-        )
+        statistics = f"Number of nodes visited: {len(animate_data['visited_nodes'])}"
+        if animate_data.get("stats"):
+            statistics += f"\n\n{animate_data['stats']}"
+        tk.messagebox.showinfo("Path Finding Statistics", statistics)
         self.animation = PathAnimation(
             self, self.start_node, self.goal_node, path, edges
         )
 
     def convert_graph_to_gui(self):
         self.nodes = [NodeGUI(node.id, node.pos[0], node.pos[1]) for node in self.nodes]
+        gui_nodes = {node.id: node for node in self.nodes}
         self.edges = [
             EdgeGUI(
                 edge.id,
-                self.get_node_by_id(edge.nodeA.id),
-                self.get_node_by_id(edge.nodeB.id),
+                gui_nodes[edge.nodeA.id],
+                gui_nodes[edge.nodeB.id],
                 edge.weight,
             )
             for edge in self.edges
         ]
+        self.rebuild_indexes()
 
     def init_ui(self, canvas):
         frame = tk.Frame(canvas.master.master)
@@ -674,3 +765,22 @@ class GraphGUI(Graph, Drawable):
             variable=self.path_algorithm_name,
             value="astar",
         ).pack(side=tk.LEFT)
+        tk.Radiobutton(
+            frame,
+            text="Bi-Dijkstra",
+            variable=self.path_algorithm_name,
+            value="bidijkstra",
+        ).pack(side=tk.LEFT)
+        tk.Radiobutton(
+            frame,
+            text="Bi-A*",
+            variable=self.path_algorithm_name,
+            value="biastar",
+        ).pack(side=tk.LEFT)
+        tk.Radiobutton(
+            frame,
+            text="CH",
+            variable=self.path_algorithm_name,
+            value="ch",
+            command=self.on_ch_select,
+        ).pack(side=tk.LEFT)
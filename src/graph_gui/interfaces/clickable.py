@@ -9,6 +9,8 @@ import abc
 
 
 class Clickable(abc.ABC):
+    __slots__ = ()
+
     @abc.abstractmethod
     def is_clicked(self, x, y):
         pass
@@ -9,6 +9,8 @@ import abc
 
 
 class Drawable(abc.ABC):
+    __slots__ = ()
+
     @abc.abstractmethod
     def draw(self, tur, *args):
         pass
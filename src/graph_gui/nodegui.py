@@ -19,6 +19,8 @@ from .constants import (
 
 
 class NodeGUI(Node, Drawable, Clickable):
+    __slots__ = ("is_selected", "is_dragging")
+
     def __init__(self, *args):
         self.is_selected = False
         self.is_dragging = False
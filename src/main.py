@@ -13,10 +13,15 @@ import traceback
 
 def one_step():
     try:
+        profiler = graphgui.profiler
+        profiler.start_frame()
         canvas.delete("all")
         tur.clear()
+        profiler.end_phase("clear")
         graphgui.draw(tur, canvas)
         screen.update()
+        profiler.end_phase("tk_update")
+        profiler.end_frame()
         screen.ontimer(one_step, 50)
     except Exception as e:
         print(e)
@@ -70,10 +75,16 @@ screen.onkey(graphgui.on_bfs_start, "b")
 screen.onkey(graphgui.on_dfs_start, "n")
 screen.onkey(graphgui.on_help_toggle, "h")
 screen.onkey(graphgui.on_nodeid_toggle, "f")
+screen.onkey(graphgui.on_profiler_toggle, "p")
+screen.onkey(graphgui.on_trace_toggle, "t")
 screen.onkey(graphgui.on_update_weight, "w")
 exited = False
 
 # Main loop
 print("Graph Visualizer starting...")
 one_step()
-screen.mainloop()
+try:
+    screen.mainloop()
+finally:
+    # Close the frame trace if it is still running
+    graphgui.profiler.stop_trace()